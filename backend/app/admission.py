@@ -0,0 +1,153 @@
+# backend/app/admission.py - admission control for the password-hashing routes
+#
+# Every login and registration costs a bcrypt hash, so a credential-stuffing
+# burst can take all of the CPU. Before doing that work an auth request must
+# get a token from its client IP's bucket and from its email's bucket, and
+# must fit under a global cap on in-flight hashes. Anything else is turned
+# away at once with a 429 and a Retry-After. The state is per process.
+import math
+import os
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import Request
+
+from . import env  # noqa: F401  (loads .env.local)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Sustained attempts per minute and burst size, per client IP and per email
+ADMISSION_IP_PER_MINUTE = float(os.getenv("ADMISSION_IP_PER_MINUTE", "30"))
+ADMISSION_IP_BURST = float(os.getenv("ADMISSION_IP_BURST", "10"))
+ADMISSION_EMAIL_PER_MINUTE = float(os.getenv("ADMISSION_EMAIL_PER_MINUTE", "6"))
+ADMISSION_EMAIL_BURST = float(os.getenv("ADMISSION_EMAIL_BURST", "5"))
+# Upper bound on tracked keys per limiter; least recently used buckets go first
+ADMISSION_MAX_KEYS = int(os.getenv("ADMISSION_MAX_KEYS", "10000"))
+# Auth requests allowed to be hashing at once in this process
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "16"))
+# Use the first X-Forwarded-For address; only safe behind a proxy that sets it
+ADMISSION_TRUST_FORWARDED = os.getenv("ADMISSION_TRUST_FORWARDED", "false").lower() == "true"
+
+class AdmissionRejected(Exception):
+    """The request was shed before doing any hashing work."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Too many requests ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucketLimiter:
+    """Token buckets keyed by an arbitrary string, bounded in number.
+
+    A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+    second. A bucket that would be full again carries no state, so expired
+    buckets are dropped during periodic sweeps; beyond ``max_keys`` the least
+    recently used bucket is dropped as well.
+    """
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = max(1.0, burst)
+        self.max_keys = max_keys
+        # Time for an empty bucket to refill completely
+        self.idle_ttl = self.burst / self.rate if self.rate > 0 else math.inf
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (tokens, updated)
+        self._next_sweep = 0.0
+        self.evictions = 0
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token for ``key``; return 0 if admitted, else seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        self._sweep(now)
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1.0:
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return (1.0 - tokens) / self.rate if self.rate > 0 else math.inf
+        self._buckets[key] = (tokens - 1.0, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+        return 0.0
+
+    def _sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + min(self.idle_ttl, 60.0)
+        # Least recently used first, so stop at the first bucket still refilling
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < self.idle_ttl:
+                break
+            del self._buckets[key]
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class AdmissionController:
+    def __init__(self, enabled: bool = ADMISSION_ENABLED, max_inflight: int = ADMISSION_MAX_INFLIGHT):
+        self.enabled = enabled
+        self.max_inflight = max_inflight
+        self.by_ip = TokenBucketLimiter(ADMISSION_IP_PER_MINUTE, ADMISSION_IP_BURST, ADMISSION_MAX_KEYS)
+        self.by_email = TokenBucketLimiter(ADMISSION_EMAIL_PER_MINUTE, ADMISSION_EMAIL_BURST, ADMISSION_MAX_KEYS)
+        self.inflight = 0
+        self.admitted: Counter = Counter()  # route -> requests let through
+        self.shed: Counter = Counter()  # (route, reason) -> requests turned away
+
+    def _reject(self, route: str, reason: str, retry_after: float) -> None:
+        self.shed[(route, reason)] += 1
+        raise AdmissionRejected(reason, retry_after)
+
+    @asynccontextmanager
+    async def admit(self, request: Request, route: str, email: str):
+        """Hold an admission slot for one auth request, or raise AdmissionRejected."""
+        if not self.enabled:
+            yield
+            return
+        if self.inflight >= self.max_inflight:
+            self._reject(route, "concurrency", 1.0)
+        # Checked one after the other so a request refused by IP costs its email nothing
+        wait = self.by_ip.acquire(client_ip(request))
+        if wait:
+            self._reject(route, "ip", wait)
+        wait = self.by_email.acquire(email.strip().lower())
+        if wait:
+            self._reject(route, "email", wait)
+        self.admitted[route] += 1
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+
+    def stats(self) -> dict:
+        stats = {
+            "enabled": self.enabled,
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "ip_buckets": len(self.by_ip),
+            "email_buckets": len(self.by_email),
+            "evictions": self.by_ip.evictions + self.by_email.evictions,
+            "admitted": sum(self.admitted.values()),
+            # Each shed request is one bcrypt hash that did not run
+            "shed": sum(self.shed.values()),
+        }
+        for (route, reason), count in sorted(self.shed.items()):
+            stats[f"shed_{route}_{reason}"] = count
+        return stats
+
+def client_ip(request: Request) -> str:
+    if ADMISSION_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(min(seconds, 3600))))
+
+admission = AdmissionController()
@@ -0,0 +1,167 @@
+# backend/app/analytics.py - pre-aggregated daily sales rollups
+#
+# sales_daily_rollups holds orders / items / revenue per day for every
+# course, instructor and level, plus an overall "total" row per day. Only
+# completed orders count. The order job adds each order when it completes
+# (record_order), rebuild_rollups recomputes a day range from the raw tables,
+# and verify_rollups reconciles the two. Reports read the rollups only.
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Course, SalesRollup
+from .schemas import DailyRevenue, RevenueTotal, RollupMismatch, RollupVerification
+
+DIMENSIONS = ("total", "course", "instructor", "level")
+REVENUE_TOLERANCE = 1e-6
+
+# One SELECT producing rollup rows for every dimension from the raw tables;
+# {where} restricts the orders (a single order, or a day range).
+AGGREGATE_SQL = """
+    SELECT 'total' AS dimension, '' AS key, date(o.created_at) AS day,
+           COUNT(DISTINCT o.id) AS orders, COUNT(*) AS items, SUM(oi.price) AS revenue
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.status = 'completed' AND {where}
+    GROUP BY day
+    UNION ALL
+    SELECT 'course', CAST(oi.course_id AS TEXT), date(o.created_at),
+           COUNT(DISTINCT o.id), COUNT(*), SUM(oi.price)
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.status = 'completed' AND {where}
+    GROUP BY oi.course_id, date(o.created_at)
+    UNION ALL
+    SELECT 'instructor', COALESCE(c.instructor, ''), date(o.created_at),
+           COUNT(DISTINCT o.id), COUNT(*), SUM(oi.price)
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id JOIN courses c ON c.id = oi.course_id
+    WHERE o.status = 'completed' AND {where}
+    GROUP BY COALESCE(c.instructor, ''), date(o.created_at)
+    UNION ALL
+    SELECT 'level', COALESCE(c.level, ''), date(o.created_at),
+           COUNT(DISTINCT o.id), COUNT(*), SUM(oi.price)
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id JOIN courses c ON c.id = oi.course_id
+    WHERE o.status = 'completed' AND {where}
+    GROUP BY COALESCE(c.level, ''), date(o.created_at)
+"""
+
+# "WHERE true" keeps SQLite from parsing ON CONFLICT as part of the SELECT
+UPSERT_SQL = """
+    INSERT INTO sales_daily_rollups (dimension, key, day, orders, items, revenue)
+    SELECT * FROM ({aggregate}) WHERE true
+    ON CONFLICT (dimension, key, day) DO UPDATE SET
+        orders = orders + excluded.orders,
+        items = items + excluded.items,
+        revenue = revenue + excluded.revenue
+"""
+
+ORDER_FILTER = "o.id = :order_id"
+RANGE_FILTER = "(:start IS NULL OR date(o.created_at) >= :start) AND (:end IS NULL OR date(o.created_at) <= :end)"
+
+def _validate_dimension(dimension: str) -> None:
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unsupported dimension: {dimension}")
+
+async def record_order(db: AsyncSession, order_id: int) -> None:
+    """Add a just-completed order to the rollups inside the caller's transaction.
+
+    Must run exactly once per order: call it only from the transition that
+    moved the order to completed.
+    """
+    await db.execute(
+        text(UPSERT_SQL.format(aggregate=AGGREGATE_SQL.format(where=ORDER_FILTER))),
+        {"order_id": order_id},
+    )
+
+async def rebuild_rollups(db: AsyncSession, start: Optional[str] = None, end: Optional[str] = None) -> int:
+    """Recompute the rollups for a day range (inclusive; open ends allowed) in one transaction.
+
+    Returns the number of rollup rows written.
+    """
+    params = {"start": start, "end": end}
+    await db.execute(
+        text("DELETE FROM sales_daily_rollups WHERE (:start IS NULL OR day >= :start) AND (:end IS NULL OR day <= :end)"),
+        params,
+    )
+    result = await db.execute(
+        text(UPSERT_SQL.format(aggregate=AGGREGATE_SQL.format(where=RANGE_FILTER))),
+        params,
+    )
+    await db.commit()
+    return result.rowcount
+
+async def verify_rollups(db: AsyncSession, start: Optional[str] = None, end: Optional[str] = None) -> RollupVerification:
+    """Compare the rollups for a day range with a fresh aggregation of the raw tables.
+
+    Attribution by instructor and level uses the courses' current values, so
+    editing a course after it was sold also shows up here; rebuild to fix.
+    """
+    params = {"start": start, "end": end}
+    Key = Tuple[str, str, str]
+
+    def collect(rows) -> Dict[Key, DailyRevenue]:
+        return {
+            (row.dimension, row.key, row.day): DailyRevenue(day=row.day, orders=row.orders, items=row.items,
+                                                           revenue=row.revenue)
+            for row in rows
+        }
+
+    expected = collect((await db.execute(text(AGGREGATE_SQL.format(where=RANGE_FILTER)), params)).all())
+    actual = collect((await db.execute(
+        text("SELECT dimension, key, day, orders, items, revenue FROM sales_daily_rollups "
+             "WHERE (:start IS NULL OR day >= :start) AND (:end IS NULL OR day <= :end)"),
+        params,
+    )).all())
+
+    mismatches = []
+    for key in sorted(expected.keys() | actual.keys()):
+        want, got = expected.get(key), actual.get(key)
+        if (want is None or got is None
+                or (want.orders, want.items) != (got.orders, got.items)
+                or abs(want.revenue - got.revenue) > REVENUE_TOLERANCE):
+            mismatches.append(RollupMismatch(dimension=key[0], key=key[1], day=key[2], expected=want, actual=got))
+    return RollupVerification(checked=len(expected.keys() | actual.keys()), mismatches=mismatches)
+
+def _in_range(query, start: Optional[str], end: Optional[str]):
+    if start:
+        query = query.where(SalesRollup.day >= start)
+    if end:
+        query = query.where(SalesRollup.day <= end)
+    return query
+
+async def revenue_totals(
+    db: AsyncSession, dimension: str, start: Optional[str] = None, end: Optional[str] = None, limit: int = 20
+) -> List[RevenueTotal]:
+    """Top keys of a dimension by revenue over a day range."""
+    _validate_dimension(dimension)
+    revenue = func.sum(SalesRollup.revenue)
+    query = _in_range(
+        select(SalesRollup.key, func.sum(SalesRollup.orders), func.sum(SalesRollup.items), revenue)
+        .where(SalesRollup.dimension == dimension),
+        start, end,
+    ).group_by(SalesRollup.key).order_by(revenue.desc(), SalesRollup.key).limit(limit)
+    rows = (await db.execute(query)).all()
+
+    labels: Dict[str, str] = {}
+    if dimension == "course" and rows:
+        result = await db.execute(
+            select(Course.id, Course.title).where(Course.id.in_([int(row[0]) for row in rows]))
+        )
+        labels = {str(course_id): title for course_id, title in result.all()}
+    return [
+        RevenueTotal(key=key, label=labels.get(key, key), orders=orders, items=items, revenue=total)
+        for key, orders, items, total in rows
+    ]
+
+async def daily_revenue(
+    db: AsyncSession, dimension: str = "total", key: str = "", start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> List[DailyRevenue]:
+    """Per-day series for one key of a dimension (the overall total by default)."""
+    _validate_dimension(dimension)
+    query = _in_range(
+        select(SalesRollup.day, SalesRollup.orders, SalesRollup.items, SalesRollup.revenue)
+        .where(SalesRollup.dimension == dimension, SalesRollup.key == key),
+        start, end,
+    ).order_by(SalesRollup.day)
+    return [DailyRevenue(day=day, orders=orders, items=items, revenue=revenue)
+            for day, orders, items, revenue in (await db.execute(query)).all()]
@@ -1,16 +1,31 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import time
+
+from . import env  # noqa: F401  (loads .env.local)
+from .cache import token_cache
 
-from dotenv import load_dotenv
 import os
-load_dotenv('.env.local')
 
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secretkey")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# What goes into the JWT "sub" claim: "email" (default) or "id" for primary-key lookups
+TOKEN_SUBJECT = os.getenv("TOKEN_SUBJECT", "email")
+
+# bcrypt cost factor; raising it makes passlib flag older hashes for rehash on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Where password hashing runs: "thread", "process" or "inline" (on the event loop)
+HASH_POOL_KIND = os.getenv("HASH_POOL_KIND", "thread")
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_POOL_QUEUE_SIZE = int(os.getenv("HASH_POOL_QUEUE_SIZE", "32"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,6 +33,84 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a fresh hash if the stored one is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class HashPoolFull(Exception):
+    """Raised when too many hashing jobs are already queued."""
+
+class HashPool:
+    """Bounded executor for bcrypt work so it never blocks the event loop.
+
+    At most ``workers`` hashes run at once and at most ``queue_size`` more may
+    wait; anything beyond that is rejected with HashPoolFull straight away.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, queue_size: int = 32):
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown hash pool kind: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.kind == "inline":
+            return func(*args)
+        if self.pending >= self.capacity:
+            self.rejected += 1
+            raise HashPoolFull("Password hashing capacity exceeded")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+hash_pool = HashPool(HASH_POOL_KIND, HASH_POOL_WORKERS, HASH_POOL_QUEUE_SIZE)
+
+def configure_hash_pool(kind: str = HASH_POOL_KIND, workers: int = HASH_POOL_WORKERS,
+                        queue_size: int = HASH_POOL_QUEUE_SIZE) -> HashPool:
+    """Replace the global hash pool (used by benchmarks and tests)."""
+    global hash_pool
+    hash_pool.shutdown()
+    hash_pool = HashPool(kind, workers, queue_size)
+    return hash_pool
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await hash_pool.run(get_password_hash, password)
+
+async def verify_and_update_password_async(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    return await hash_pool.run(verify_and_update_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -30,4 +123,21 @@ def decode_access_token(token: str):
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError:
-        return None 
\ No newline at end of file
+        return None
+
+def token_subject(user) -> str:
+    """Return the "sub" claim for a user according to TOKEN_SUBJECT."""
+    return str(user.id) if TOKEN_SUBJECT == "id" else user.email
+
+def decode_access_token_cached(token: str):
+    """Decode a token, memoizing the claims until the token expires."""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(token, payload, ttl=remaining)
+    return payload
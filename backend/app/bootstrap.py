@@ -0,0 +1,57 @@
+# backend/app/bootstrap.py - combined first-load payload for the frontend
+#
+# Each section is loaded on its own read session, so the queries run on
+# separate connections at the same time and the whole request takes about
+# as long as the slowest section.
+import asyncio
+from typing import Iterable, List
+
+from . import crud
+from .database_sqlite import AsyncReadSessionLocal, session_scope
+from .schemas import BootstrapRead, CartItemRead, OrderHistoryPage, OrderRead, UserRead
+
+BOOTSTRAP_FIELDS = ("user", "cart", "orders", "order_history", "courses")
+DEFAULT_FIELDS = ("user", "cart", "orders")
+
+def parse_fields(fields: str) -> List[str]:
+    """Validate a comma-separated field list; raises ValueError for unknown names."""
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in BOOTSTRAP_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown bootstrap fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(selected))
+
+async def _load_cart(user_id: int) -> List[CartItemRead]:
+    async with session_scope(AsyncReadSessionLocal) as db:
+        return [CartItemRead.model_validate(item) for item in await crud.get_user_cart(db, user_id)]
+
+async def _load_orders(user_id: int) -> List[OrderRead]:
+    async with session_scope(AsyncReadSessionLocal) as db:
+        return [OrderRead.model_validate(order) for order in await crud.get_user_orders(db, user_id)]
+
+async def _load_order_history(user_id: int, limit: int) -> OrderHistoryPage:
+    async with session_scope(AsyncReadSessionLocal) as db:
+        items, next_cursor = await crud.get_user_order_summaries(db, user_id, limit=limit)
+        return OrderHistoryPage(items=items, next_cursor=next_cursor)
+
+async def _load_courses(limit: int):
+    async with session_scope(AsyncReadSessionLocal) as db:
+        return await crud.get_courses_cached(db, limit=limit)
+
+async def load_bootstrap(user: UserRead, fields: Iterable[str], course_limit: int = 20,
+                         order_limit: int = 20) -> BootstrapRead:
+    loaders = {}
+    if "cart" in fields:
+        loaders["cart"] = _load_cart(user.id)
+    if "orders" in fields:
+        loaders["orders"] = _load_orders(user.id)
+    if "order_history" in fields:
+        loaders["order_history"] = _load_order_history(user.id, order_limit)
+    if "courses" in fields:
+        loaders["courses"] = _load_courses(course_limit)
+
+    results = await asyncio.gather(*loaders.values())
+    sections = dict(zip(loaders, results))
+    if "user" in fields:
+        sections["user"] = user
+    return BootstrapRead(**sections)
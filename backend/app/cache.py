@@ -0,0 +1,132 @@
+# backend/app/cache.py
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from . import env  # noqa: F401  (loads .env.local)
+
+CATALOG_CACHE_ENABLED = os.getenv("CATALOG_CACHE_ENABLED", "true").lower() == "true"
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "512"))
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "4096"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+# Upper bound only; each token entry is also capped at the token's own expiry
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "86400"))
+
+_MISSING = object()
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+class CatalogCache(TTLCache):
+    """Course catalog cache keyed by (catalog version, query parameters).
+
+    Every write to the catalog bumps the version, which makes all entries
+    stored under an older version unreachable. Readers capture the version
+    before loading from the database, so a load racing with a write can
+    never be stored under the new version. The version is private to this
+    process; `revision` remembers the persisted catalog version (catalog_state)
+    read since the last bump, for building ETags that agree across workers.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300.0, enabled: bool = True):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.enabled = enabled
+        self.version = 0
+        self.revision: Optional[int] = None
+
+    def bump_version(self) -> int:
+        self.version += 1
+        self.revision = None
+        # Old entries can never be hit again, drop them right away
+        self.clear()
+        return self.version
+
+    def lookup(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        return self.get((self.version, key))
+
+    def store(self, version: int, key: Hashable, value: Any) -> None:
+        if self.enabled and version == self.version:
+            self.set((version, key), value)
+
+    def set_revision(self, version: int, revision: int) -> None:
+        """Remember the persisted version read while the cache was at `version`."""
+        if version == self.version:
+            self.revision = revision
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update({"enabled": self.enabled, "version": self.version, "revision": self.revision})
+        return stats
+
+catalog_cache = CatalogCache(
+    maxsize=CATALOG_CACHE_SIZE,
+    ttl=CATALOG_CACHE_TTL,
+    enabled=CATALOG_CACHE_ENABLED,
+)
+
+# Authenticated principals (UserRead snapshots) keyed by ("id", user_id) or ("email", email)
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+# Decoded JWT claims keyed by the raw token; entries expire with the token itself
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
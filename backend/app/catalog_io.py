@@ -0,0 +1,263 @@
+# backend/app/catalog_io.py - streaming bulk import/export of the course catalog
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import invalidation
+from .cache import catalog_cache
+from .crud import bump_catalog_version, refresh_cart_summaries
+from .database_sqlite import AsyncReadSessionLocal, AsyncSessionLocal
+from .models import Course
+from .schemas import CourseCreate, CourseImportReport, ImportRowError
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_MODES = ("upsert", "insert")
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# Column order for exports (and the CSV header)
+EXPORT_COLUMNS = (
+    "id", "external_id", "title", "description", "price", "instructor", "duration",
+    "level", "image_url", "category_id", "is_active", "created_at",
+)
+UPDATABLE_COLUMNS = tuple(CourseCreate.model_fields)
+
+Record = Tuple[int, object]  # (row number, parsed record or parse error message)
+
+async def iter_lines(chunks: AsyncIterable) -> AsyncIterator[str]:
+    """Split a stream of byte (or str) chunks into decoded lines without buffering it all."""
+    pending = b""
+    async for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+async def _aiter(lines: Iterable[str]) -> AsyncIterator[str]:
+    for line in lines:
+        yield line.rstrip("\r\n")
+
+async def parse_ndjson(lines: AsyncIterable[str]) -> AsyncIterator[Record]:
+    row = 0
+    async for line in lines:
+        row += 1
+        if not line.strip():
+            continue
+        try:
+            yield row, json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+
+async def parse_csv(lines: AsyncIterable[str]) -> AsyncIterator[Record]:
+    """Parse CSV with a header row; quoted fields may span several lines."""
+    header: Optional[List[str]] = None
+    buffer: List[str] = []
+    row = 0
+    async for line in lines:
+        buffer.append(line)
+        # An odd number of quotes means a quoted field continues on the next line
+        if "\n".join(buffer).count('"') % 2:
+            continue
+        text = "\n".join(buffer)
+        buffer = []
+        if header is None:
+            header = next(csv.reader([text]))
+            continue
+        row += 1
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]), [])
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty CSV cells mean "not provided", so an upsert keeps the stored value
+        yield row, {key: value for key, value in zip(header, values) if value != ""}
+    if buffer:
+        yield row + 1, "Unterminated quoted field"
+
+def parse_records(lines: AsyncIterable[str], fmt: str) -> AsyncIterator[Record]:
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return parse_ndjson(lines) if fmt == "ndjson" else parse_csv(lines)
+
+async def _existing_keys(db: AsyncSession, keys: List[str]) -> set:
+    if not keys:
+        return set()
+    result = await db.execute(select(Course.external_id).where(Course.external_id.in_(keys)))
+    return set(result.scalars().all())
+
+async def _refresh_carts(db: AsyncSession, updated_keys: List[str]) -> None:
+    """Updated courses may have a new price; recount the carts that hold them."""
+    if updated_keys:
+        await refresh_cart_summaries(db, select(Course.id).where(Course.external_id.in_(updated_keys)))
+
+def _write_statement(mode: str, fields: Tuple[str, ...]):
+    """INSERT for rows providing `fields`; an upsert overwrites only those columns."""
+    statement = sqlite_insert(Course)
+    if mode == "upsert":
+        statement = statement.on_conflict_do_update(
+            index_elements=["external_id"],
+            set_={column: statement.excluded[column] for column in fields if column != "external_id"},
+        )
+    return statement
+
+def _fields(values: Dict) -> Tuple[str, ...]:
+    return tuple(column for column in UPDATABLE_COLUMNS if column in values)
+
+async def _flush(db: AsyncSession, rows: List[Tuple[int, Dict]], mode: str, report: CourseImportReport) -> None:
+    """Write one validated chunk with a single executemany, isolating bad rows on failure."""
+    if not rows:
+        return
+    keys = [values["external_id"] for _, values in rows if values.get("external_id")]
+    existing = await _existing_keys(db, keys) if mode == "upsert" else set()
+    # One executemany per set of provided fields; normally the whole chunk shares one
+    groups: Dict[Tuple[str, ...], List[Dict]] = {}
+    for _, values in rows:
+        groups.setdefault(_fields(values), []).append(values)
+    try:
+        for fields, group in groups.items():
+            await db.execute(_write_statement(mode, fields), group)
+        await _refresh_carts(db, [key for key in keys if key in existing])
+        await bump_catalog_version(db)
+        await db.commit()
+    except DBAPIError:
+        # Some row violates a constraint; retry one by one so only that row fails
+        await db.rollback()
+        for row, values in rows:
+            try:
+                await db.execute(_write_statement(mode, _fields(values)), [values])
+                await _refresh_carts(db, [values["external_id"]] if values.get("external_id") in existing else [])
+                await bump_catalog_version(db)
+                await db.commit()
+            except DBAPIError as e:
+                await db.rollback()
+                _record_error(report, row, str(e.orig))
+                continue
+            _count_write(report, values, existing)
+        return
+    for _, values in rows:
+        _count_write(report, values, existing)
+
+def _count_write(report: CourseImportReport, values: Dict, existing: set) -> None:
+    if values.get("external_id") in existing:
+        report.updated += 1
+    else:
+        report.inserted += 1
+
+def _record_error(report: CourseImportReport, row: int, message: str) -> None:
+    report.failed += 1
+    if len(report.errors) < MAX_REPORTED_ERRORS:
+        report.errors.append(ImportRowError(row=row, error=message))
+
+async def import_courses(
+    db: AsyncSession,
+    records: AsyncIterable[Record],
+    mode: str = "upsert",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> CourseImportReport:
+    """Validate and write course records in chunks.
+
+    Rows with an external_id are upserted on that natural key (or rejected as
+    duplicates in "insert" mode); rows without one are always inserted. An
+    update only overwrites the fields the row provides (keys present in NDJSON,
+    non-empty cells in CSV); an explicit null clears a field. Invalid rows are
+    reported and skipped without aborting the rest of the import.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unsupported mode: {mode}")
+    report = CourseImportReport()
+    chunk: List[Tuple[int, Dict]] = []
+    seen_keys: set = set()
+    try:
+        async for row, record in records:
+            if isinstance(record, str):
+                _record_error(report, row, record)
+                continue
+            try:
+                course = CourseCreate.model_validate(record)
+            except ValidationError as e:
+                _record_error(report, row, "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            values = course.model_dump(exclude_unset=True)
+            key = values.get("external_id")
+            if key:
+                # The same key twice in one executemany would hide the first row
+                if key in seen_keys:
+                    await _flush(db, chunk, mode, report)
+                    chunk, seen_keys = [], set()
+                seen_keys.add(key)
+            chunk.append((row, values))
+            if len(chunk) >= chunk_size:
+                await _flush(db, chunk, mode, report)
+                chunk, seen_keys = [], set()
+        await _flush(db, chunk, mode, report)
+    finally:
+        if report.inserted or report.updated:
+            catalog_cache.bump_version()
+            # Chunks were committed as they went; tell the other workers in a
+            # transaction of its own, which also works after a failed chunk
+            async with AsyncSessionLocal() as own:
+                invalidation.publish(own, "catalog")
+                await own.commit()
+            invalidation.bus.notify()
+    return report
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def export_courses(fmt: str = "ndjson", include_inactive: bool = False,
+                         batch_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Stream the catalog through a server-side cursor, one batch of rows at a time.
+
+    Opens its own read session because the response body is produced after
+    the request's dependencies have been torn down.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    columns = [getattr(Course, name) for name in EXPORT_COLUMNS]
+    query = select(*columns).order_by(Course.id).execution_options(yield_per=batch_size)
+    if not include_inactive:
+        query = query.where(Course.is_active == True)
+
+    async with AsyncReadSessionLocal() as session:
+        result = await session.stream(query)
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue().encode()
+        async for partition in result.partitions(batch_size):
+            if fmt == "ndjson":
+                yield "".join(
+                    json.dumps({name: _export_value(value) for name, value in zip(EXPORT_COLUMNS, row)},
+                               ensure_ascii=False) + "\n"
+                    for row in partition
+                ).encode()
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([_export_value(value) for value in row] for row in partition)
+                yield buffer.getvalue().encode()
+
+async def import_file(db: AsyncSession, path: str, fmt: Optional[str] = None, mode: str = "upsert",
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> CourseImportReport:
+    """Import a local NDJSON/CSV file; the format defaults to the file extension."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return await import_courses(db, parse_records(_aiter(f), fmt), mode=mode, chunk_size=chunk_size)
@@ -0,0 +1,132 @@
+# backend/app/cli.py - management commands
+#
+#   cd backend
+#   python -m app.cli import-courses catalog.ndjson
+#   python -m app.cli export-courses --format csv > courses.csv
+#   python -m app.cli grant-admin admin@example.com
+#   python -m app.cli rebuild-ratings
+#   python -m app.cli rebuild-related
+#   python -m app.cli rebuild-analytics --start 2024-01-01
+#   python -m app.cli verify-analytics
+import argparse
+import asyncio
+import json
+import sys
+
+from . import models  # noqa: F401  (register tables before create_all_tables)
+from .database_sqlite import AsyncSessionLocal, create_all_tables, close_database_connections
+
+async def import_courses(args):
+    from . import catalog_io
+
+    async with AsyncSessionLocal() as db:
+        report = await catalog_io.import_file(db, args.path, fmt=args.format, mode=args.mode,
+                                              chunk_size=args.chunk_size)
+    print(json.dumps(report.model_dump(), ensure_ascii=False, indent=2))
+    return 0 if not report.failed else 1
+
+async def export_courses(args):
+    from . import catalog_io
+
+    out = sys.stdout.buffer
+    async for chunk in catalog_io.export_courses(args.format, include_inactive=args.include_inactive):
+        out.write(chunk)
+    out.flush()
+    return 0
+
+async def grant_admin(args):
+    from . import crud
+
+    async with AsyncSessionLocal() as db:
+        user = await crud.get_user_by_email(db, args.email)
+        if not user:
+            print(f"User not found: {args.email}", file=sys.stderr)
+            return 1
+        await crud.set_user_admin(db, user.id, not args.revoke)
+    print(f"{args.email}: is_admin={not args.revoke}")
+    return 0
+
+async def rebuild_ratings(args):
+    from . import crud
+
+    async with AsyncSessionLocal() as db:
+        rated = await crud.rebuild_rating_aggregates(db)
+    print(f"Rebuilt rating aggregates ({rated} rated courses)")
+    return 0
+
+async def rebuild_related(args):
+    from . import recommendations
+
+    async with AsyncSessionLocal() as db:
+        pairs = await recommendations.rebuild_copurchases(db, batch_size=args.batch_size)
+    print(f"Rebuilt co-purchase index ({pairs} course pairs)")
+    return 0
+
+async def rebuild_analytics(args):
+    from . import analytics
+
+    async with AsyncSessionLocal() as db:
+        rows = await analytics.rebuild_rollups(db, start=args.start, end=args.end)
+    print(f"Rebuilt sales rollups ({rows} rows)")
+    return 0
+
+async def verify_analytics(args):
+    from . import analytics
+
+    async with AsyncSessionLocal() as db:
+        report = await analytics.verify_rollups(db, start=args.start, end=args.end)
+    print(json.dumps(report.model_dump(), ensure_ascii=False, indent=2))
+    return 0 if not report.mismatches else 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Course Store management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import-courses", help="bulk import courses from an NDJSON or CSV file")
+    p.add_argument("path")
+    p.add_argument("--format", choices=("ndjson", "csv"), help="defaults to the file extension")
+    p.add_argument("--mode", choices=("upsert", "insert"), default="upsert")
+    p.add_argument("--chunk-size", type=int, default=500)
+    p.set_defaults(handler=import_courses)
+
+    p = commands.add_parser("export-courses", help="stream the catalog to stdout")
+    p.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    p.add_argument("--include-inactive", action="store_true")
+    p.set_defaults(handler=export_courses)
+
+    p = commands.add_parser("grant-admin", help="give (or --revoke) admin rights to a user")
+    p.add_argument("email")
+    p.add_argument("--revoke", action="store_true")
+    p.set_defaults(handler=grant_admin)
+
+    p = commands.add_parser("rebuild-ratings", help="recompute course rating aggregates from the reviews")
+    p.set_defaults(handler=rebuild_ratings)
+
+    p = commands.add_parser("rebuild-related", help="recompute the co-purchase index from order history")
+    p.add_argument("--batch-size", type=int, default=1000)
+    p.set_defaults(handler=rebuild_related)
+
+    for name, handler, help_text in (
+        ("rebuild-analytics", rebuild_analytics, "recompute the daily sales rollups for a day range"),
+        ("verify-analytics", verify_analytics, "reconcile the sales rollups with the order tables"),
+    ):
+        p = commands.add_parser(name, help=help_text)
+        p.add_argument("--start", help="first day (YYYY-MM-DD), default: all")
+        p.add_argument("--end", help="last day (YYYY-MM-DD), default: all")
+        p.set_defaults(handler=handler)
+
+    return parser
+
+async def _run(args) -> int:
+    await create_all_tables()
+    try:
+        return await args.handler(args)
+    finally:
+        await close_database_connections()
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
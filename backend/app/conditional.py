@@ -0,0 +1,66 @@
+# backend/app/conditional.py - ETags and If-None-Match handling for conditional GETs
+#
+# ETags are built from persisted version markers that are cheap to read: the
+# catalog version (catalog_state, remembered by each worker until the next
+# catalog change) and the per-user cart / order revision counters (one
+# primary-key lookup). Every worker, before and after a restart, derives the
+# same tag for the same data. A matching If-None-Match is answered with 304
+# before any rows are loaded or serialized.
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+CATALOG_CACHE_CONTROL = "no-cache"
+USER_CACHE_CONTROL = "private, no-cache"
+
+# Suffix added to the ETag of a compressed representation (see with_etag)
+_ENCODING_SUFFIX = "-{}"
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+def catalog_etag(catalog_revision: int) -> str:
+    return make_etag("catalog", catalog_revision)
+
+def cart_etag(user_id: int, cart_revision: int, catalog_revision: int) -> str:
+    # Cart items embed course data, so catalog changes invalidate it too
+    return make_etag("cart", user_id, cart_revision, catalog_revision)
+
+def orders_etag(user_id: int, orders_revision: int, catalog_revision: int) -> str:
+    return make_etag("orders", user_id, orders_revision, catalog_revision)
+
+def order_history_etag(user_id: int, orders_revision: int, after: Optional[str], limit: int) -> str:
+    # One tag per page. The cursor is client input, so it goes in as a digest;
+    # summaries carry no course data, so catalog changes don't matter
+    page = hashlib.sha256((after or "").encode()).hexdigest()[:16]
+    return make_etag("orders-history", user_id, orders_revision, limit, page)
+
+def _normalize(tag: str) -> str:
+    """Weak comparison: drop W/ and any content-coding suffix we appended."""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    suffix = _ENCODING_SUFFIX.format("gzip") + '"'
+    if tag.endswith(suffix):
+        return tag[:-len(suffix)] + '"'
+    return tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_normalize(tag) == etag for tag in if_none_match.split(","))
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def with_etag(response: Response, etag: str, cache_control: str) -> Response:
+    """Attach validators; compressed bodies get their own (suffixed) strong ETag."""
+    coding = response.headers.get("content-encoding")
+    if coding:
+        etag = etag[:-1] + _ENCODING_SUFFIX.format(coding) + '"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -1,11 +1,21 @@
 # backend/app/crud.py
+from sqlalchemy import String, case, delete, func, insert, literal, text, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from .models import User, Course, CartItem, Order, OrderItem
-from .schemas import UserCreate, CourseCreate, CartItemCreate
-from .auth import get_password_hash
-from typing import List, Optional
+from .models import User, Course, CartItem, CatalogState, Order, OrderItem, Review
+from .schemas import (
+    UserCreate, UserRead, CourseCreate, CourseRead, CartItemCreate,
+    CartBatchAddResult, CartBatchRemoveResult, CartSummary, ReviewCreate, ReviewUpdate, RatingSummary,
+    OrderSummary,
+)
+from . import invalidation, jobs, recommendations
+from .auth import get_password_hash_async
+from .cache import catalog_cache, principal_cache
+from .pagination import COURSE_SORT_FIELDS, encode_cursor, decode_cursor, validate_sort
+from typing import List, Optional, Sequence, Tuple
 
 # User CRUD
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
@@ -17,23 +27,180 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     return result.scalars().first()
 
 async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
-    hashed_password = get_password_hash(user_create.password)
+    hashed_password = await get_password_hash_async(user_create.password)
     db_user = User(
         name=user_create.name, 
         email=user_create.email, 
         hashed_password=hashed_password
     )
     db.add(db_user)
+    _publish_principal(db, db_user)
     await db.commit()
+    invalidation.bus.notify()
     await db.refresh(db_user)
     return db_user
 
+async def update_user_password_hash(db: AsyncSession, user: User, hashed_password: str) -> User:
+    user.hashed_password = hashed_password
+    _publish_principal(db, user)
+    await db.commit()
+    invalidate_principal(user)
+    return user
+
+async def set_user_active(db: AsyncSession, user_id: int, is_active: bool) -> Optional[User]:
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return None
+    user.is_active = is_active
+    _publish_principal(db, user)
+    await db.commit()
+    invalidate_principal(user)
+    return user
+
+async def set_user_admin(db: AsyncSession, user_id: int, is_admin: bool) -> Optional[User]:
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return None
+    user.is_admin = is_admin
+    _publish_principal(db, user)
+    await db.commit()
+    invalidate_principal(user)
+    return user
+
+# Cached principal lookups for authentication. The subject is either a user id
+# (all digits) or an email, depending on how the token was issued.
+def invalidate_principal(user) -> None:
+    principal_cache.pop(("id", user.id))
+    principal_cache.pop(("email", user.email))
+    invalidation.bus.notify()
+
+def _publish_principal(db: AsyncSession, user) -> None:
+    # The user is not flushed yet on creation; its email still names the stale entries
+    if user.id is not None:
+        invalidation.publish(db, "principal", str(user.id))
+    invalidation.publish(db, "principal", user.email)
+
+def _evict_principal(key: Optional[str]) -> None:
+    if key is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(("id", int(key)) if key.isdigit() else ("email", key))
+
+invalidation.subscribe("principal", _evict_principal)
+
+async def get_principal(db: AsyncSession, subject: str) -> Optional[UserRead]:
+    key = ("id", int(subject)) if subject.isdigit() else ("email", subject)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        return cached
+    if key[0] == "id":
+        user = await get_user_by_id(db, key[1])
+    else:
+        user = await get_user_by_email(db, subject)
+    if user is None:
+        return None
+    principal = UserRead.model_validate(user)
+    principal_cache.set(key, principal)
+    return principal
+
 # Course CRUD
-async def get_courses(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Course]:
+# Passing `columns` selects just those columns and returns plain rows instead
+# of Course objects (used by the fast serialization path).
+def _select_courses(columns: Optional[Sequence] = None):
+    return select(*columns) if columns else select(Course)
+
+def _course_results(result, columns: Optional[Sequence] = None):
+    return result.all() if columns else result.scalars().all()
+
+async def get_courses(
+    db: AsyncSession, skip: int = 0, limit: int = 100, columns: Optional[Sequence] = None
+) -> List[Course]:
     result = await db.execute(
-        select(Course).where(Course.is_active == True).offset(skip).limit(limit)
+        _select_courses(columns)
+        .where(Course.is_active == True)
+        .order_by(Course.id)
+        .offset(skip)
+        .limit(limit)
     )
-    return result.scalars().all()
+    return _course_results(result, columns)
+
+def _keyset_value(sort: str, value):
+    # created_at is filled by SQLite's CURRENT_TIMESTAMP ("YYYY-MM-DD HH:MM:SS"),
+    # so compare against the same text form rather than SQLAlchemy's microsecond format
+    if sort == "created_at" and value is not None:
+        text = value.strftime("%Y-%m-%d %H:%M:%S")
+        if value.microsecond:
+            text += f".{value.microsecond:06d}"
+        return literal(text, String)
+    return value
+
+async def get_courses_page(
+    db: AsyncSession,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    after: Optional[str] = None,
+    columns: Optional[Sequence] = None,
+) -> Tuple[List[Course], Optional[str]]:
+    """Keyset pagination over active courses ordered by (sort key, id).
+
+    Returns the page and a cursor for the next page, or None on the last page.
+    Custom `columns` must include the sort column and Course.id.
+    """
+    sort, order = validate_sort(sort, order)
+    sort_column = getattr(Course, COURSE_SORT_FIELDS[sort])
+    key = tuple_(sort_column, Course.id)
+
+    query = _select_courses(columns).where(Course.is_active == True)
+    if after:
+        sort_value, last_id = decode_cursor(after, sort, order)
+        sort_value = _keyset_value(sort, sort_value)
+        if order == "asc":
+            query = query.where(key > tuple_(sort_value, last_id))
+        else:
+            query = query.where(key < tuple_(sort_value, last_id))
+
+    if order == "asc":
+        query = query.order_by(sort_column.asc(), Course.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), Course.id.desc())
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    courses = _course_results(result, columns)
+
+    next_cursor = None
+    if len(courses) > limit:
+        courses = courses[:limit]
+        last = courses[-1]
+        next_cursor = encode_cursor(sort, order, getattr(last, COURSE_SORT_FIELDS[sort]), last.id)
+    return courses, next_cursor
+
+async def bump_catalog_version(db: AsyncSession) -> None:
+    """Advance the persisted catalog version (the ETag validator) in the caller's transaction."""
+    await db.execute(update(CatalogState).where(CatalogState.id == 1).values(version=CatalogState.version + 1))
+
+async def publish_catalog(db: AsyncSession) -> None:
+    """Record a catalog write in the caller's transaction; call catalog_changed() after committing."""
+    invalidation.publish(db, "catalog")
+    await bump_catalog_version(db)
+
+async def get_catalog_revision(db: AsyncSession) -> int:
+    """Persisted catalog version; read once per worker after each catalog change."""
+    if catalog_cache.revision is not None:
+        return catalog_cache.revision
+    version = catalog_cache.version
+    result = await db.execute(select(CatalogState.version).where(CatalogState.id == 1))
+    revision = result.scalar() or 0
+    catalog_cache.set_revision(version, revision)
+    return revision
+
+def catalog_changed() -> None:
+    """Evict this worker's catalog caches and wake the others, after committing a "catalog" invalidation."""
+    catalog_cache.bump_version()
+    invalidation.bus.notify()
+
+invalidation.subscribe("catalog", lambda key: catalog_cache.bump_version())
 
 async def get_course_by_id(db: AsyncSession, course_id: int) -> Optional[Course]:
     result = await db.execute(select(Course).where(Course.id == course_id))
@@ -42,11 +209,278 @@ async def get_course_by_id(db: AsyncSession, course_id: int) -> Optional[Course]
 async def create_course(db: AsyncSession, course_create: CourseCreate) -> Course:
     db_course = Course(**course_create.dict())
     db.add(db_course)
+    await publish_catalog(db)
     await db.commit()
+    catalog_changed()
     await db.refresh(db_course)
     return db_course
 
+# Cached catalog reads. These return CourseRead snapshots rather than ORM
+# objects so cached entries are never bound to (or mutated through) a session.
+def _snapshot(courses) -> List[CourseRead]:
+    return [CourseRead.model_validate(course) for course in courses]
+
+async def get_courses_cached(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[CourseRead]:
+    key = ("courses", skip, limit)
+    cached = catalog_cache.lookup(key)
+    if cached is not None:
+        return cached
+    version = catalog_cache.version
+    courses = _snapshot(await get_courses(db, skip=skip, limit=limit))
+    catalog_cache.store(version, key, courses)
+    return courses
+
+async def get_courses_page_cached(
+    db: AsyncSession,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    after: Optional[str] = None,
+) -> Tuple[List[CourseRead], Optional[str]]:
+    key = ("courses_page", limit, sort, order, after)
+    cached = catalog_cache.lookup(key)
+    if cached is not None:
+        return cached
+    version = catalog_cache.version
+    courses, next_cursor = await get_courses_page(db, limit=limit, sort=sort, order=order, after=after)
+    page = (_snapshot(courses), next_cursor)
+    catalog_cache.store(version, key, page)
+    return page
+
+async def get_top_rated_courses(
+    db: AsyncSession, limit: int = 10, min_reviews: int = 1
+) -> List[Course]:
+    """Best rated active courses, read in ix_courses_active_rating order."""
+    result = await db.execute(
+        select(Course)
+        .where(Course.is_active == True, Course.rating_count >= min_reviews)
+        .order_by(Course.rating_avg.desc(), Course.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_top_rated_courses_cached(
+    db: AsyncSession, limit: int = 10, min_reviews: int = 1
+) -> List[CourseRead]:
+    key = ("top_rated", limit, min_reviews)
+    cached = catalog_cache.lookup(key)
+    if cached is not None:
+        return cached
+    version = catalog_cache.version
+    courses = _snapshot(await get_top_rated_courses(db, limit=limit, min_reviews=min_reviews))
+    catalog_cache.store(version, key, courses)
+    return courses
+
+async def get_course_by_id_cached(db: AsyncSession, course_id: int) -> Optional[CourseRead]:
+    key = ("course", course_id)
+    cached = catalog_cache.lookup(key)
+    if cached is not None:
+        return cached
+    version = catalog_cache.version
+    course = await get_course_by_id(db, course_id)
+    if course is None:
+        return None
+    snapshot = CourseRead.model_validate(course)
+    catalog_cache.store(version, key, snapshot)
+    return snapshot
+
+# Review CRUD
+def _rating_delta(added: Optional[int] = None, removed: Optional[int] = None) -> dict:
+    """UPDATE values moving a course's aggregates by one added and/or removed rating.
+
+    The SET expressions all see the row's old values, so the average is
+    computed from the new sum and count in the same statement.
+    """
+    count_delta = (added is not None) - (removed is not None)
+    sum_delta = (added or 0) - (removed or 0)
+    new_count = Course.rating_count + count_delta
+    values = {
+        "rating_count": new_count,
+        "rating_sum": Course.rating_sum + sum_delta,
+        "rating_avg": case((new_count > 0, (Course.rating_sum + sum_delta) * 1.0 / new_count), else_=0.0),
+    }
+    for stars in {added, removed} - {None}:
+        delta = (stars == added) - (stars == removed)
+        if delta:
+            column = f"rating_{stars}"
+            values[column] = getattr(Course, column) + delta
+    return values
+
+async def _apply_rating_delta(db: AsyncSession, course_id: int, added: Optional[int] = None,
+                              removed: Optional[int] = None) -> None:
+    await db.execute(update(Course).where(Course.id == course_id).values(**_rating_delta(added, removed)))
+
+async def get_course_reviews(db: AsyncSession, course_id: int, skip: int = 0, limit: int = 20) -> List[Review]:
+    result = await db.execute(
+        select(Review)
+        .where(Review.course_id == course_id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_rating_summary(db: AsyncSession, course_id: int) -> Optional[RatingSummary]:
+    result = await db.execute(
+        select(Course.rating_count, Course.rating_avg, Course.rating_1, Course.rating_2,
+               Course.rating_3, Course.rating_4, Course.rating_5)
+        .where(Course.id == course_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return RatingSummary(
+        course_id=course_id,
+        count=row[0],
+        average=row[1],
+        histogram={stars: row[stars + 1] for stars in range(1, 6)},
+    )
+
+async def create_review(db: AsyncSession, user_id: int, course_id: int, review_create: ReviewCreate) -> Review:
+    result = await db.execute(select(Course.id).where(Course.id == course_id, Course.is_active == True))
+    if result.scalar() is None:
+        raise ValueError("Course not found")
+
+    review = Review(course_id=course_id, user_id=user_id, **review_create.model_dump())
+    db.add(review)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise ValueError("Course already reviewed")
+    await _apply_rating_delta(db, course_id, added=review.rating)
+    await publish_catalog(db)
+    await db.commit()
+    catalog_changed()
+    await db.refresh(review)
+    return review
+
+async def _get_own_review(db: AsyncSession, user_id: int, review_id: int) -> Optional[Review]:
+    result = await db.execute(select(Review).where(Review.id == review_id, Review.user_id == user_id))
+    return result.scalars().first()
+
+async def update_review(db: AsyncSession, user_id: int, review_id: int,
+                        review_update: ReviewUpdate) -> Optional[Review]:
+    review = await _get_own_review(db, user_id, review_id)
+    if review is None:
+        return None
+    old_rating = review.rating
+    for field, value in review_update.model_dump(exclude_unset=True).items():
+        if field == "rating" and value is None:
+            continue
+        setattr(review, field, value)
+    review.updated_at = func.now()
+    rating_changed = review.rating != old_rating
+    if rating_changed:
+        await _apply_rating_delta(db, review.course_id, added=review.rating, removed=old_rating)
+        await publish_catalog(db)
+    await db.commit()
+    if rating_changed:
+        catalog_changed()
+    await db.refresh(review)
+    return review
+
+async def delete_review(db: AsyncSession, user_id: int, review_id: int) -> bool:
+    review = await _get_own_review(db, user_id, review_id)
+    if review is None:
+        return False
+    await db.delete(review)
+    await _apply_rating_delta(db, review.course_id, removed=review.rating)
+    await publish_catalog(db)
+    await db.commit()
+    catalog_changed()
+    return True
+
+REBUILD_RATINGS_SQL = [
+    """
+    UPDATE courses SET rating_count = 0, rating_sum = 0, rating_avg = 0,
+        rating_1 = 0, rating_2 = 0, rating_3 = 0, rating_4 = 0, rating_5 = 0
+    """,
+    """
+    UPDATE courses SET
+        rating_count = agg.n, rating_sum = agg.total, rating_avg = agg.total * 1.0 / agg.n,
+        rating_1 = agg.r1, rating_2 = agg.r2, rating_3 = agg.r3, rating_4 = agg.r4, rating_5 = agg.r5
+    FROM (
+        SELECT course_id, COUNT(*) AS n, SUM(rating) AS total,
+               SUM(rating = 1) AS r1, SUM(rating = 2) AS r2, SUM(rating = 3) AS r3,
+               SUM(rating = 4) AS r4, SUM(rating = 5) AS r5
+        FROM reviews GROUP BY course_id
+    ) AS agg
+    WHERE courses.id = agg.course_id
+    """,
+]
+
+async def rebuild_rating_aggregates(db: AsyncSession) -> int:
+    """Recompute every course's aggregates from the reviews table in one pass.
+
+    Returns the number of courses that have reviews.
+    """
+    await db.execute(text(REBUILD_RATINGS_SQL[0]))
+    result = await db.execute(text(REBUILD_RATINGS_SQL[1]))
+    await publish_catalog(db)
+    await db.commit()
+    catalog_changed()
+    return result.rowcount
+
 # Cart CRUD
+async def get_user_revisions(db: AsyncSession, user_id: int) -> Tuple[int, int]:
+    """Return the user's (cart_revision, orders_revision) markers."""
+    result = await db.execute(
+        select(User.cart_revision, User.orders_revision).where(User.id == user_id)
+    )
+    row = result.first()
+    return (row[0] or 0, row[1] or 0) if row else (0, 0)
+
+def cart_summary_values() -> dict:
+    """users.cart_item_count / cart_total recomputed from the user's cart_items.
+
+    Correlated to the users row being updated; priced like checkout, so the
+    badge total matches the order total.
+    """
+    cart = (
+        select(func.count())
+        .select_from(CartItem)
+        .join(Course, Course.id == CartItem.course_id)
+        .where(CartItem.user_id == User.id)
+    )
+    return {
+        "cart_item_count": cart.scalar_subquery(),
+        "cart_total": cart.with_only_columns(func.coalesce(func.sum(Course.price), 0.0)).scalar_subquery(),
+    }
+
+async def get_cart_summary(db: AsyncSession, user_id: int) -> CartSummary:
+    """Item count, total and revision from the users row: one primary-key lookup."""
+    result = await db.execute(
+        select(User.cart_item_count, User.cart_total, User.cart_revision).where(User.id == user_id)
+    )
+    row = result.first()
+    if not row:
+        return CartSummary(item_count=0, total=0.0, revision=0)
+    return CartSummary(item_count=row[0] or 0, total=row[1] or 0.0, revision=row[2] or 0)
+
+async def refresh_cart_summaries(db: AsyncSession, course_ids) -> None:
+    """Recount the carts holding any of these courses after their prices changed.
+
+    `course_ids` may be a list or a select of course ids; runs in the caller's transaction.
+    """
+    holders = select(CartItem.user_id).where(CartItem.course_id.in_(course_ids))
+    await db.execute(
+        update(User)
+        .where(User.id.in_(holders))
+        .values(cart_revision=func.coalesce(User.cart_revision, 0) + 1, **cart_summary_values())
+    )
+
+async def _bump_revisions(db: AsyncSession, user_id: int, cart: bool = False, orders: bool = False) -> None:
+    """Advance the ETag markers (and recount the cart summary) inside the caller's transaction."""
+    values = {}
+    if cart:
+        values["cart_revision"] = func.coalesce(User.cart_revision, 0) + 1
+        values.update(cart_summary_values())
+    if orders:
+        values["orders_revision"] = func.coalesce(User.orders_revision, 0) + 1
+    if values:
+        await db.execute(update(User).where(User.id == user_id).values(**values))
+
 async def get_user_cart(db: AsyncSession, user_id: int) -> List[CartItem]:
     result = await db.execute(
         select(CartItem)
@@ -55,22 +489,47 @@ async def get_user_cart(db: AsyncSession, user_id: int) -> List[CartItem]:
     )
     return result.scalars().all()
 
-async def add_to_cart(db: AsyncSession, user_id: int, course_id: int) -> CartItem:
-    # Check if already in cart
-    existing = await db.execute(
-        select(CartItem).where(
-            CartItem.user_id == user_id, 
-            CartItem.course_id == course_id
+async def add_to_cart(db: AsyncSession, user_id: int, course_id: int) -> None:
+    result = await add_to_cart_batch(db, user_id, [course_id])
+    if result.missing:
+        raise ValueError("Course not found")
+    if result.skipped:
+        raise ValueError("Course already in cart")
+
+async def add_to_cart_batch(db: AsyncSession, user_id: int, course_ids: List[int]) -> CartBatchAddResult:
+    """Add several courses with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+    Only active courses are inserted; the unique (user_id, course_id) index
+    turns duplicates into no-ops, even under concurrent requests.
+    """
+    course_ids = list(dict.fromkeys(course_ids))
+    statement = (
+        sqlite_insert(CartItem)
+        .from_select(
+            ["user_id", "course_id", "created_at"],
+            select(literal(user_id), Course.id, func.now())
+            .where(Course.id.in_(course_ids), Course.is_active == True)
         )
+        .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+        .returning(CartItem.course_id)
     )
-    if existing.scalars().first():
-        raise ValueError("Course already in cart")
-    
-    cart_item = CartItem(user_id=user_id, course_id=course_id)
-    db.add(cart_item)
+    added = set((await db.execute(statement)).scalars().all())
+    await _bump_revisions(db, user_id, cart=bool(added))
     await db.commit()
-    await db.refresh(cart_item)
-    return cart_item
+
+    missing = set()
+    if len(added) < len(course_ids):
+        # Only pay for the lookup when something was not inserted
+        result = await db.execute(
+            select(Course.id).where(Course.id.in_(course_ids), Course.is_active == True)
+        )
+        missing = set(course_ids) - set(result.scalars().all())
+
+    return CartBatchAddResult(
+        added=[course_id for course_id in course_ids if course_id in added],
+        skipped=[course_id for course_id in course_ids if course_id not in added and course_id not in missing],
+        missing=[course_id for course_id in course_ids if course_id in missing],
+    )
 
 async def remove_from_cart(db: AsyncSession, user_id: int, cart_item_id: int) -> bool:
     result = await db.execute(
@@ -82,46 +541,177 @@ async def remove_from_cart(db: AsyncSession, user_id: int, cart_item_id: int) ->
     cart_item = result.scalars().first()
     if cart_item:
         await db.delete(cart_item)
+        await _bump_revisions(db, user_id, cart=True)
         await db.commit()
         return True
     return False
 
+async def remove_from_cart_batch(db: AsyncSession, user_id: int, course_ids: List[int]) -> CartBatchRemoveResult:
+    """Remove several courses from the cart with a single DELETE ... WHERE course_id IN (...)."""
+    course_ids = list(dict.fromkeys(course_ids))
+    result = await db.execute(
+        delete(CartItem)
+        .where(CartItem.user_id == user_id, CartItem.course_id.in_(course_ids))
+        .returning(CartItem.course_id)
+    )
+    removed = set(result.scalars().all())
+    await _bump_revisions(db, user_id, cart=bool(removed))
+    await db.commit()
+    return CartBatchRemoveResult(
+        removed=[course_id for course_id in course_ids if course_id in removed],
+        missing=[course_id for course_id in course_ids if course_id not in removed],
+    )
+
 async def clear_cart(db: AsyncSession, user_id: int):
-    await db.execute(
+    result = await db.execute(
         CartItem.__table__.delete().where(CartItem.user_id == user_id)
     )
+    await _bump_revisions(db, user_id, cart=result.rowcount > 0)
     await db.commit()
 
 # Order CRUD
-async def create_order_from_cart(db: AsyncSession, user_id: int) -> Order:
-    # Get cart items
-    cart_items = await get_user_cart(db, user_id)
-    if not cart_items:
-        raise ValueError("Cart is empty")
-    
-    # Calculate total
-    total_amount = sum(item.course.price for item in cart_items)
-    
-    # Create order
-    order = Order(user_id=user_id, total_amount=total_amount)
-    await db.add(order)
-    await db.flush()  # Get order ID
-    
-    # Create order items
-    for cart_item in cart_items:
-        order_item = OrderItem(
-            order_id=order.id,
-            course_id=cart_item.course_id,
-            price=cart_item.course.price
+async def get_order_with_items(db: AsyncSession, order_id: int) -> Optional[Order]:
+    result = await db.execute(
+        select(Order)
+        .options(
+            selectinload(Order.order_items).selectinload(OrderItem.course)
         )
-        await db.add(order_item)
-    
-    # Clear cart
-    await clear_cart(db, user_id)
-    
-    await db.commit()
-    await db.refresh(order)
-    return order
+        .where(Order.id == order_id)
+    )
+    return result.scalars().first()
+
+async def get_order_by_idempotency_key(db: AsyncSession, user_id: int, idempotency_key: str) -> Optional[Order]:
+    result = await db.execute(
+        select(Order.id).where(
+            Order.user_id == user_id,
+            Order.idempotency_key == idempotency_key
+        )
+    )
+    order_id = result.scalar()
+    return await get_order_with_items(db, order_id) if order_id else None
+
+async def create_order_from_cart(
+    db: AsyncSession, user_id: int, idempotency_key: Optional[str] = None
+) -> Order:
+    """Check out the user's cart in one transaction using set-based statements.
+
+    The order total, the order items and the cart cleanup are all computed
+    in SQL from cart_items joined to courses, so the number of statements
+    does not depend on how many courses are in the cart.
+    """
+    if idempotency_key:
+        existing = await get_order_by_idempotency_key(db, user_id, idempotency_key)
+        if existing:
+            return existing
+
+    cart = (
+        select(CartItem.course_id, Course.price)
+        .join(Course, Course.id == CartItem.course_id)
+        .where(CartItem.user_id == user_id)
+    )
+    totals = cart.with_only_columns(
+        literal(user_id),
+        func.sum(Course.price),
+        literal("pending"),
+        func.now(),
+        literal(idempotency_key, String),
+    ).having(func.count() > 0)
+
+    try:
+        result = await db.execute(
+            insert(Order)
+            .from_select(["user_id", "total_amount", "status", "created_at", "idempotency_key"], totals)
+            .returning(Order.id)
+        )
+        order_id = result.scalar()
+        if order_id is None:
+            raise ValueError("Cart is empty")
+
+        await db.execute(
+            insert(OrderItem).from_select(
+                ["order_id", "course_id", "price"],
+                cart.with_only_columns(literal(order_id), CartItem.course_id, Course.price)
+            )
+        )
+        await db.execute(delete(CartItem).where(CartItem.user_id == user_id))
+        await recommendations.record_order_pairs(db, order_id)
+        await _bump_revisions(db, user_id, cart=True, orders=True)
+        # Payment and the status change happen in the background (see fulfillment.py)
+        jobs.enqueue(db, "order.process", {"order_id": order_id})
+        await db.commit()
+    except (IntegrityError, ValueError):
+        await db.rollback()
+        # A concurrent retry carrying the same key may have already checked out
+        # this cart (empty cart) or inserted the order first (unique violation)
+        existing = await get_order_by_idempotency_key(db, user_id, idempotency_key) if idempotency_key else None
+        if not existing:
+            raise
+        return existing
+
+    jobs.job_queue.notify()
+    return await get_order_with_items(db, order_id)
+
+async def set_order_status(db: AsyncSession, order_id: int, status: str, from_status: str = "pending") -> bool:
+    """Move an order from `from_status` to `status` inside the caller's transaction.
+
+    Returns False (and changes nothing) if the order is not in `from_status`,
+    which makes repeated transitions by retried jobs harmless.
+    """
+    result = await db.execute(
+        update(Order)
+        .where(Order.id == order_id, Order.status == from_status)
+        .values(status=status)
+        .returning(Order.user_id)
+    )
+    user_id = result.scalar()
+    if user_id is None:
+        return False
+    await _bump_revisions(db, user_id, orders=True)
+    return True
+
+async def get_user_order(db: AsyncSession, user_id: int, order_id: int) -> Optional[Order]:
+    """One of the user's orders with full line-item detail."""
+    result = await db.execute(
+        select(Order)
+        .options(
+            selectinload(Order.order_items).selectinload(OrderItem.course)
+        )
+        .where(Order.id == order_id, Order.user_id == user_id)
+    )
+    return result.scalars().first()
+
+async def get_user_order_summaries(
+    db: AsyncSession, user_id: int, limit: int = 20, after: Optional[str] = None
+) -> Tuple[List[OrderSummary], Optional[str]]:
+    """Keyset page of the user's orders, newest first, without loading line items.
+
+    Reads ix_orders_user_created_at in order; item counts come from a
+    correlated COUNT over order_items(order_id) for just the rows on the page.
+    """
+    item_count = (
+        select(func.count(OrderItem.id))
+        .where(OrderItem.order_id == Order.id)
+        .scalar_subquery()
+    )
+    query = (
+        select(Order.id, Order.total_amount, Order.status, item_count.label("item_count"), Order.created_at)
+        .where(Order.user_id == user_id)
+    )
+    if after:
+        created_at, last_id = decode_cursor(after, "created_at", "desc")
+        query = query.where(
+            tuple_(Order.created_at, Order.id) < tuple_(_keyset_value("created_at", created_at), last_id)
+        )
+    result = await db.execute(
+        query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("created_at", "desc", rows[-1].created_at, rows[-1].id)
+    return [OrderSummary.model_validate(row._asdict()) for row in rows], next_cursor
 
 async def get_user_orders(db: AsyncSession, user_id: int) -> List[Order]:
     result = await db.execute(
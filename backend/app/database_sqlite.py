@@ -1,12 +1,14 @@
 # backend/app/database_sqlite.py - SQLite configuration for local development
+from contextlib import asynccontextmanager
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
-from dotenv import load_dotenv
 import logging
 
-# Load environment variables
-load_dotenv('.env.local')
+from . import env  # noqa: F401  (loads .env.local)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,15 +17,86 @@ logger = logging.getLogger(__name__)
 # Database configuration for SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./course_store.db")
 
-# Create async engine for SQLite
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,  # Set to True for SQL debugging
-    future=True,
-    connect_args={"check_same_thread": False}  # Required for SQLite
-)
+# Storage profiles: PRAGMAs applied to every new SQLite connection.
+# "production" uses WAL so readers never wait for writers; "default" keeps
+# SQLite's stock rollback journal. Individual SQLITE_* variables override.
+STORAGE_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,         # ms to wait for a lock instead of failing
+        "cache_size": -65536,         # negative = KiB, i.e. 64 MiB page cache
+        "mmap_size": 268435456,       # 256 MiB memory-mapped I/O
+        "temp_store": "MEMORY",
+    },
+}
+STORAGE_PROFILE = os.getenv("SQLITE_STORAGE_PROFILE", "production")
+
+def _storage_pragmas() -> dict:
+    if STORAGE_PROFILE not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown SQLite storage profile: {STORAGE_PROFILE}")
+    pragmas = dict(STORAGE_PROFILES[STORAGE_PROFILE])
+    for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store"):
+        value = os.getenv(f"SQLITE_{name.upper()}")
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+SQLITE_PRAGMAS = _storage_pragmas()
+
+# Connection pool sizing (ignored for in-memory databases)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+def _is_memory_database(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in database
+
+def _create_engine(url: str, pool_size: int, max_overflow: int, read_only: bool = False):
+    pool_args = {}
+    if not _is_memory_database(url):
+        pool_args = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_pre_ping": False,
+        }
+    new_engine = create_async_engine(
+        url,
+        echo=False,  # Set to True for SQL debugging
+        future=True,
+        connect_args={"check_same_thread": False},  # Required for SQLite
+        **pool_args
+    )
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            # Guard against accidental writes through the read engine
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return new_engine
+
+# Write engine: every mutation goes through here
+engine = _create_engine(DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+
+# Read engine: a separate pool of query-only connections for GET traffic. With
+# WAL these read a consistent snapshot and never queue behind the writer. An
+# in-memory database is private to one connection, so it shares the write engine.
+if _is_memory_database(DATABASE_URL):
+    read_engine = engine
+else:
+    read_engine = _create_engine(DATABASE_URL, DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW, read_only=True)
 
-# Create async session factory
+# Create async session factories
 AsyncSessionLocal = sessionmaker(
     engine,
     class_=AsyncSession,
@@ -32,13 +105,22 @@ AsyncSessionLocal = sessionmaker(
     autocommit=False
 )
 
+AsyncReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False
+)
+
 # Create declarative base
 Base = declarative_base()
 
-# Dependency for getting database session
-async def get_db() -> AsyncSession:
-    """Dependency that provides a database session."""
-    async with AsyncSessionLocal() as session:
+# Dependencies for getting database sessions
+@asynccontextmanager
+async def session_scope(session_factory=None):
+    """Open a session, rolling back and logging if the caller raises."""
+    async with (session_factory or AsyncSessionLocal)() as session:
         try:
             yield session
         except Exception as e:
@@ -48,19 +130,44 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+async def get_db(request: Request) -> AsyncSession:
+    """Dependency that provides a database session.
+
+    Safe (GET/HEAD/OPTIONS) requests get a session on the read-only engine,
+    everything else gets a session on the write engine.
+    """
+    factory = AsyncReadSessionLocal if request.method in SAFE_METHODS else AsyncSessionLocal
+    async with session_scope(factory) as session:
+        yield session
+
+async def get_read_db() -> AsyncSession:
+    """Dependency that always provides a read-only session."""
+    async with session_scope(AsyncReadSessionLocal) as session:
+        yield session
+
+async def get_write_db() -> AsyncSession:
+    """Dependency that always provides a session on the write engine."""
+    async with session_scope(AsyncSessionLocal) as session:
+        yield session
+
 # Database utility functions
 async def create_all_tables():
-    """Create all database tables."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        logger.info("All database tables created successfully")
+    """Bring the database schema up to date (see migrations.py)."""
+    # Imported here because the migrations depend on the models
+    from .migrations import migrate
+    report = await migrate(engine)
+    if report["applied"]:
+        logger.info(f"Database schema migrated to version {report['schema_version']}: {', '.join(report['applied'])}")
+    return report
 
 async def health_check():
     """Perform a health check on the database."""
     try:
         async with AsyncSessionLocal() as session:
             # Simple query to check connection
-            result = await session.execute("SELECT 1 as health_check")
+            result = await session.execute(text("SELECT 1 as health_check"))
             health_result = result.fetchone()
             
             if health_result and health_result[0] == 1:
@@ -84,4 +191,6 @@ async def health_check():
 async def close_database_connections():
     """Close all database connections."""
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
     logger.info("Database connections closed")
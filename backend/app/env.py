@@ -0,0 +1,5 @@
+# backend/app/env.py - load .env.local exactly once
+# Every module that reads settings at import time imports this first.
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
@@ -0,0 +1,157 @@
+# backend/app/fastpath.py - opt-in fast serialization for list endpoints
+#
+# The regular path builds a Pydantic model per ORM row (from_attributes),
+# validates it and then JSON-encodes it. Here list endpoints select only the
+# columns the response needs as plain rows and encode them directly. Public
+# catalog pages are additionally kept as fully rendered (optionally
+# compressed) bytes in the catalog cache until the catalog version changes.
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import env  # noqa: F401  (loads .env.local)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from . import crud
+from .cache import catalog_cache
+from .models import CartItem, Course, Order, OrderItem
+from .schemas import CourseRead
+
+ENABLED = os.getenv("FAST_RESPONSES", "false").lower() == "true"
+# Catalog responses smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = int(os.getenv("FAST_RESPONSES_COMPRESS_MIN_BYTES", "1024"))
+COMPRESSION_ENABLED = os.getenv("FAST_RESPONSES_COMPRESS", "true").lower() == "true"
+
+# Exactly the columns CourseRead exposes, in schema order
+COURSE_FIELDS = tuple(CourseRead.model_fields)
+COURSE_COLUMNS = tuple(getattr(Course, name) for name in COURSE_FIELDS)
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+def _course_dict(row) -> Dict:
+    return dict(zip(COURSE_FIELDS, row))
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick gzip if the Accept-Encoding header allows it, honouring q=0."""
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip().lower())
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def _compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+def json_response(body: bytes, encoding: Optional[str] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+    headers = dict(headers or {})
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def catalog_response(
+    request: Request,
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    after: Optional[str] = None,
+) -> Response:
+    """Rendered catalog page served from the catalog cache when possible.
+
+    Raises ValueError for a bad sort or cursor, like crud.get_courses_page.
+    """
+    cursor_mode = sort is not None or after is not None
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    key = ("fast_courses", skip, limit, sort, order, after, encoding)
+    cached = catalog_cache.lookup(key)
+    if cached is None:
+        version = catalog_cache.version
+        next_cursor = None
+        if cursor_mode:
+            rows, next_cursor = await crud.get_courses_page(
+                db, limit=limit, sort=sort, order=order, after=after, columns=COURSE_COLUMNS
+            )
+        else:
+            rows = await crud.get_courses(db, skip=skip, limit=limit, columns=COURSE_COLUMNS)
+        body = dumps([_course_dict(row) for row in rows])
+        if len(body) < COMPRESS_MIN_BYTES:
+            encoding = None
+        cached = (_compress(body, encoding), encoding, next_cursor)
+        catalog_cache.store(version, key, cached)
+
+    body, body_encoding, next_cursor = cached
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(body, body_encoding, headers)
+
+async def cart_response(db: AsyncSession, user_id: int) -> Response:
+    result = await db.execute(
+        select(CartItem.id, CartItem.created_at, *COURSE_COLUMNS)
+        .join(Course, Course.id == CartItem.course_id)
+        .where(CartItem.user_id == user_id)
+        .order_by(CartItem.id)
+    )
+    items = [
+        {"id": row[0], "course": _course_dict(row[2:]), "created_at": row[1]}
+        for row in result.all()
+    ]
+    return json_response(dumps(items))
+
+async def orders_response(db: AsyncSession, user_id: int) -> Response:
+    """Order history in the OrderRead shape with two column-only queries."""
+    orders_result = await db.execute(
+        select(Order.id, Order.total_amount, Order.status, Order.created_at)
+        .where(Order.user_id == user_id)
+        .order_by(Order.created_at.desc())
+    )
+    orders: List[Dict] = []
+    by_id: Dict[int, List] = {}
+    for order_id, total_amount, status, created_at in orders_result.all():
+        items: List[Dict] = []
+        by_id[order_id] = items
+        orders.append({
+            "id": order_id,
+            "total_amount": total_amount,
+            "status": status,
+            "created_at": created_at,
+            "order_items": items,
+        })
+
+    if by_id:
+        items_result = await db.execute(
+            select(OrderItem.order_id, OrderItem.id, OrderItem.price, *COURSE_COLUMNS)
+            .join(Course, Course.id == OrderItem.course_id)
+            .where(OrderItem.order_id.in_(list(by_id)))
+            .order_by(OrderItem.id)
+        )
+        for row in items_result.all():
+            by_id[row[0]].append({"id": row[1], "course": _course_dict(row[3:]), "price": row[2]})
+
+    return json_response(dumps(orders))
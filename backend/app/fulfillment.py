@@ -0,0 +1,86 @@
+# backend/app/fulfillment.py - post-checkout work run by the job queue
+#
+# Checkout only creates the pending order and enqueues "order.process".
+# The job confirms payment and moves the order to completed (or cancelled),
+# then enqueues the receipt. Every step is idempotent because jobs run at
+# least once.
+import asyncio
+import logging
+import os
+import random
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import analytics, crud, jobs
+from .models import Order, User
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STUB_LATENCY_MS = float(os.getenv("PAYMENT_STUB_LATENCY_MS", "50"))
+PAYMENT_STUB_DECLINE_RATE = float(os.getenv("PAYMENT_STUB_DECLINE_RATE", "0"))
+PAYMENT_STUB_ERROR_RATE = float(os.getenv("PAYMENT_STUB_ERROR_RATE", "0"))
+
+class PaymentDeclined(Exception):
+    """The provider refused the payment; retrying will not help."""
+
+class PaymentProviderError(Exception):
+    """Transient provider failure; the job is retried."""
+
+class StubPaymentProvider:
+    """Stand-in for a real payment provider with configurable latency and failures."""
+
+    async def confirm(self, order_id: int, amount: float) -> str:
+        await asyncio.sleep(PAYMENT_STUB_LATENCY_MS / 1000)
+        roll = random.random()
+        if roll < PAYMENT_STUB_DECLINE_RATE:
+            raise PaymentDeclined(f"Payment for order {order_id} declined")
+        if roll < PAYMENT_STUB_DECLINE_RATE + PAYMENT_STUB_ERROR_RATE:
+            raise PaymentProviderError("Payment provider unavailable")
+        return f"stub_{uuid.uuid4().hex}"
+
+payment_provider = StubPaymentProvider()
+
+async def cancel_order(db: AsyncSession, payload: dict, error: str) -> None:
+    if await crud.set_order_status(db, payload["order_id"], "cancelled"):
+        logger.warning(f"Order {payload['order_id']} cancelled: {error}")
+    await db.commit()
+
+@jobs.job_handler("order.process", on_failure=cancel_order)
+async def process_order(db: AsyncSession, payload: dict) -> None:
+    order_id = payload["order_id"]
+    result = await db.execute(select(Order.status, Order.total_amount).where(Order.id == order_id))
+    order = result.first()
+    if order is None:
+        raise jobs.PermanentJobError(f"Order {order_id} not found")
+    if order.status != "pending":
+        return  # already handled by an earlier attempt
+
+    try:
+        payment_id = await payment_provider.confirm(order_id, order.total_amount)
+    except PaymentDeclined as e:
+        await cancel_order(db, payload, str(e))
+        return
+
+    # The status change, the sales rollups and the follow-up job commit together,
+    # so each happens exactly once even if this job runs again
+    if await crud.set_order_status(db, order_id, "completed"):
+        await analytics.record_order(db, order_id)
+        jobs.enqueue(db, "order.receipt", {"order_id": order_id, "payment_id": payment_id})
+    await db.commit()
+    jobs.job_queue.notify()
+
+@jobs.job_handler("order.receipt")
+async def send_receipt(db: AsyncSession, payload: dict) -> None:
+    result = await db.execute(
+        select(User.email, Order.total_amount)
+        .join(Order, Order.user_id == User.id)
+        .where(Order.id == payload["order_id"])
+    )
+    row = result.first()
+    if row is None:
+        raise jobs.PermanentJobError(f"Order {payload['order_id']} not found")
+    # No mail transport is configured; log the receipt instead
+    logger.info(f"Receipt for order {payload['order_id']} ({row.total_amount:.2f}, "
+                f"payment {payload.get('payment_id')}) sent to {row.email}")
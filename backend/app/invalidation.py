@@ -0,0 +1,226 @@
+# backend/app/invalidation.py - cache invalidation across worker processes
+#
+# Every worker keeps its own in-memory caches. A write that makes cached data
+# stale adds a row to cache_invalidations in the same transaction (publish),
+# evicts in its own process after committing, and the other workers evict
+# when their poller reads the row, at most INVALIDATION_POLL_INTERVAL later.
+# Ids only grow, so a poll is one indexed range scan past the last id seen.
+#
+# With INVALIDATION_SOCKET_DIR set, each worker also listens on a Unix
+# datagram socket there and writers ping all of them after committing, so
+# the others poll right away. The table stays the source of truth: a lost
+# ping only costs the poll interval.
+import asyncio
+import logging
+import os
+import secrets
+import socket
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import env  # noqa: F401  (loads .env.local)
+from .database_sqlite import AsyncReadSessionLocal, AsyncSessionLocal
+from .models import CacheInvalidation
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_ENABLED = os.getenv("INVALIDATION_ENABLED", "true").lower() == "true"
+INVALIDATION_POLL_INTERVAL = float(os.getenv("INVALIDATION_POLL_INTERVAL", "0.5"))
+# Entries older than this are pruned; a worker that falls further behind evicts everything
+INVALIDATION_RETENTION_SECONDS = float(os.getenv("INVALIDATION_RETENTION_SECONDS", "3600"))
+INVALIDATION_SOCKET_DIR = os.getenv("INVALIDATION_SOCKET_DIR", "")
+INVALIDATION_BATCH_SIZE = 500
+
+# topic -> handler(key); key None means "everything in this topic"
+Handler = Callable[[Optional[str]], None]
+_handlers: Dict[str, Handler] = {}
+
+def subscribe(topic: str, handler: Handler) -> None:
+    _handlers[topic] = handler
+
+def publish(db: AsyncSession, topic: str, key: Optional[str] = None) -> None:
+    """Add an invalidation to the caller's transaction; other workers apply it after commit.
+
+    The caller still evicts its own cache after committing, then calls
+    bus.notify() to wake the other workers.
+    """
+    db.add(CacheInvalidation(topic=topic, key=key, origin=bus.origin, created_at=time.time()))
+
+class InvalidationBus:
+    def __init__(self, socket_dir: str = INVALIDATION_SOCKET_DIR):
+        self.origin = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self.socket_dir = socket_dir
+        self.last_seen: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._listener: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._pruned_at = 0.0
+        self.polls = 0
+        self.applied = 0
+        self.resets = 0
+        self.pings_sent = 0
+        self.pings_received = 0
+
+    @property
+    def socket_path(self) -> str:
+        return os.path.join(self.socket_dir, f"{self.origin}.sock")
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        async with AsyncReadSessionLocal() as db:
+            result = await db.execute(select(func.max(CacheInvalidation.id)))
+            # Caches start empty, so nothing written before now needs applying
+            self.last_seen = result.scalar() or 0
+        if self.socket_dir:
+            self._listen()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Cache invalidation bus started at id {self.last_seen} "
+                    f"({'socket + poll' if self._listener else 'poll'} every {INVALIDATION_POLL_INTERVAL}s)")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._listener is not None:
+            asyncio.get_running_loop().remove_reader(self._listener.fileno())
+            self._listener.close()
+            self._listener = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    def _listen(self) -> None:
+        os.makedirs(self.socket_dir, exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        listener.setblocking(False)
+        listener.bind(self.socket_path)
+        asyncio.get_running_loop().add_reader(listener.fileno(), self._on_ping)
+        self._listener = listener
+
+    def _on_ping(self) -> None:
+        try:
+            while True:
+                self._listener.recv(64)
+                self.pings_received += 1
+        except (BlockingIOError, OSError):
+            pass
+        self._wakeup.set()
+
+    def notify(self) -> None:
+        """Ping the other workers' sockets after a commit that published invalidations."""
+        if not self.socket_dir:
+            return
+        try:
+            names = [name for name in os.listdir(self.socket_dir) if name.endswith(".sock")]
+        except FileNotFoundError:
+            return
+        if self._sender is None:
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+        for name in names:
+            path = os.path.join(self.socket_dir, name)
+            if path == self.socket_path:
+                continue
+            try:
+                self._sender.sendto(b"!", path)
+                self.pings_sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a worker that died; nobody is listening
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except OSError:
+                pass  # receiver's queue is full, it has a poll pending anyway
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), INVALIDATION_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.poll()
+                await self._prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation poll failed")
+                await asyncio.sleep(INVALIDATION_POLL_INTERVAL)
+
+    async def poll(self) -> int:
+        """Apply invalidations written by other processes since the last poll."""
+        applied = 0
+        while True:
+            async with AsyncReadSessionLocal() as db:
+                result = await db.execute(
+                    select(CacheInvalidation.id, CacheInvalidation.topic, CacheInvalidation.key,
+                           CacheInvalidation.origin)
+                    .where(CacheInvalidation.id > self.last_seen)
+                    .order_by(CacheInvalidation.id)
+                    .limit(INVALIDATION_BATCH_SIZE)
+                )
+                rows = result.all()
+            self.polls += 1
+            if not rows:
+                return applied
+            if rows[0].id != self.last_seen + 1:
+                # Writes commit one at a time, so ids arrive without holes
+                # unless the entries we needed were already pruned
+                self._reset()
+            else:
+                applied += self._apply(rows)
+            self.last_seen = rows[-1].id
+            if len(rows) < INVALIDATION_BATCH_SIZE:
+                return applied
+
+    def _apply(self, rows: List) -> int:
+        # A burst of writes to one topic usually repeats the same keys
+        pending = dict.fromkeys((row.topic, row.key) for row in rows if row.origin != self.origin)
+        for topic, key in pending:
+            handler = _handlers.get(topic)
+            if handler is not None:
+                handler(key)
+        self.applied += len(pending)
+        return len(pending)
+
+    def _reset(self) -> None:
+        logger.warning("Missed cache invalidations; evicting all cached data")
+        self.resets += 1
+        for handler in _handlers.values():
+            handler(None)
+
+    async def _prune(self) -> None:
+        now = time.monotonic()
+        if now - self._pruned_at < INVALIDATION_RETENTION_SECONDS / 10:
+            return
+        self._pruned_at = now
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(CacheInvalidation)
+                .where(CacheInvalidation.created_at < time.time() - INVALIDATION_RETENTION_SECONDS)
+            )
+            await db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": INVALIDATION_ENABLED,
+            "running": self._task is not None,
+            "socket": self._listener is not None,
+            "last_seen": self.last_seen or 0,
+            "polls": self.polls,
+            "applied": self.applied,
+            "resets": self.resets,
+            "pings_sent": self.pings_sent,
+            "pings_received": self.pings_received,
+        }
+
+bus = InvalidationBus()
@@ -0,0 +1,282 @@
+# backend/app/jobs.py - persistent in-process background job queue
+#
+# Jobs are rows in the `jobs` table, written in the same transaction as the
+# change that caused them, so they survive restarts. One dispatcher task per
+# process looks for due jobs with a read-only SELECT and only then claims one
+# with an atomic UPDATE ... RETURNING that also takes a lease, so an idle queue
+# never takes SQLite's write lock. Claimed jobs run in up to JOB_WORKERS
+# concurrent tasks; a job whose worker died is picked up again once its lease
+# expires. Failures are retried with exponential backoff, and finished jobs
+# are deleted after JOB_RETENTION_DAYS.
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import metrics
+from .database_sqlite import AsyncReadSessionLocal, AsyncSessionLocal
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "1.0"))  # seconds before the first retry
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "300"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Idle workers also poll this often, for retries coming due and jobs queued by other processes
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+# done / failed jobs older than this are deleted (checked about once an hour)
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+JOB_PRUNE_INTERVAL = 3600.0
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job fails right away."""
+
+Handler = Callable[[AsyncSession, dict], Awaitable[None]]
+FailureHook = Callable[[AsyncSession, dict, str], Awaitable[None]]
+
+@dataclass
+class JobType:
+    handler: Handler
+    on_failure: Optional[FailureHook] = None
+    max_attempts: int = JOB_MAX_ATTEMPTS
+
+_job_types: Dict[str, JobType] = {}
+
+def job_handler(kind: str, on_failure: Optional[FailureHook] = None, max_attempts: Optional[int] = None):
+    """Register the decorated coroutine as the handler for `kind` jobs.
+
+    Handlers run at least once per job, so they must be idempotent. The
+    optional `on_failure` hook runs once the job has failed for good.
+    """
+    def decorator(handler: Handler) -> Handler:
+        _job_types[kind] = JobType(handler, on_failure, max_attempts or JOB_MAX_ATTEMPTS)
+        return handler
+    return decorator
+
+def enqueue(db: AsyncSession, kind: str, payload: dict, delay: float = 0.0) -> Job:
+    """Add a job to the caller's transaction; it becomes visible on commit.
+
+    Call job_queue.notify() after committing to wake an idle worker.
+    """
+    job_type = _job_types.get(kind)
+    now = time.time()
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        status="queued",
+        attempts=0,
+        max_attempts=job_type.max_attempts if job_type else JOB_MAX_ATTEMPTS,
+        run_at=now + delay,
+        enqueued_at=now,
+    )
+    db.add(job)
+    return job
+
+def backoff_seconds(attempts: int) -> float:
+    return min(JOB_BACKOFF_BASE * 2 ** (attempts - 1), JOB_BACKOFF_MAX)
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self._slots = asyncio.Semaphore(workers)
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._depth_checked = 0.0
+        self._pruned_at = float("-inf")  # prune on the first pass
+        self.running = 0
+        self.queued = 0  # refreshed at most once per poll interval
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.pruned = 0
+
+    async def start(self) -> None:
+        if self._dispatcher is not None:
+            return
+        self._stopping = False
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let running jobs finish (up to `timeout`); unfinished ones are re-run after their lease."""
+        dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is None:
+            return
+        self._stopping = True
+        dispatcher.cancel()
+        await asyncio.gather(dispatcher, return_exceptions=True)
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wake the dispatcher after committing an enqueue; it claims one job per free worker."""
+        self._wakeup.set()
+
+    async def _dispatch(self) -> None:
+        while not self._stopping:
+            await self._slots.acquire()
+            try:
+                # Cleared before looking, so a notify() during the lookup is not lost
+                self._wakeup.clear()
+                await self._refresh_depth()
+                await self._prune()
+                job = await self._claim()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            except Exception:
+                # e.g. the database is locked or gone; back off and keep dispatching
+                self._slots.release()
+                logger.exception("Job dispatcher error")
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+                continue
+            if job is None:
+                self._slots.release()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._run_in_slot(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_in_slot(self, job) -> None:
+        try:
+            await self._run(job)
+        except Exception:
+            logger.exception(f"Job {job.id} ({job.kind}) could not be recorded")
+        finally:
+            self._slots.release()
+
+    async def _refresh_depth(self) -> None:
+        now = time.monotonic()
+        if now - self._depth_checked < JOB_POLL_INTERVAL:
+            return
+        self._depth_checked = now
+        async with AsyncReadSessionLocal() as db:
+            result = await db.execute(select(func.count()).select_from(Job).where(Job.status == "queued"))
+            self.queued = result.scalar()
+
+    async def _prune(self) -> None:
+        now = time.monotonic()
+        if now - self._pruned_at < JOB_PRUNE_INTERVAL:
+            return
+        self._pruned_at = now
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(Job)
+                .where(Job.status.in_(("done", "failed")),
+                       Job.finished_at < time.time() - JOB_RETENTION_DAYS * 86400)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        if result.rowcount:
+            self.pruned += result.rowcount
+            logger.info(f"Deleted {result.rowcount} finished jobs older than {JOB_RETENTION_DAYS:g} days")
+
+    async def _claim(self):
+        now = time.time()
+        due = (
+            select(Job.id)
+            .where(or_(
+                and_(Job.status == "queued", Job.run_at <= now),
+                and_(Job.status == "running", Job.locked_until < now),  # lease expired
+            ))
+            .order_by(Job.run_at, Job.id)
+            .limit(1)
+        )
+        # Look on the read engine first: an idle queue never takes the write lock
+        async with AsyncReadSessionLocal() as db:
+            if (await db.execute(due)).first() is None:
+                return None
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == due.scalar_subquery())
+                .values(status="running", attempts=Job.attempts + 1, locked_until=now + JOB_LEASE_SECONDS)
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.run_at)
+                .execution_options(synchronize_session=False)
+            )
+            job = result.first()
+            await db.commit()
+        return job
+
+    async def _run(self, job) -> None:
+        job_type = _job_types.get(job.kind)
+        started = time.time()
+        payload = json.loads(job.payload)
+        error = None
+        permanent = False
+        self.running += 1
+        try:
+            if job_type is None:
+                raise PermanentJobError(f"No handler registered for {job.kind}")
+            async with AsyncSessionLocal() as db:
+                await job_type.handler(db, payload)
+        except PermanentJobError as e:
+            error, permanent = str(e), True
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed")
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            self.running -= 1
+        finished = time.time()
+
+        if error is None:
+            outcome, values = "done", {"status": "done", "finished_at": finished}
+            self.completed += 1
+        elif permanent or job.attempts >= job.max_attempts:
+            outcome, values = "failed", {"status": "failed", "finished_at": finished}
+            self.failed += 1
+        else:
+            outcome = "retry"
+            values = {"status": "queued", "run_at": finished + backoff_seconds(job.attempts)}
+            self.retried += 1
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job.id)
+                .values(locked_until=None, last_error=error, **values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        if outcome == "failed" and job_type is not None and job_type.on_failure is not None:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await job_type.on_failure(db, payload, error)
+            except Exception:
+                logger.exception(f"Failure hook for job {job.id} ({job.kind}) failed")
+
+        # Wait = how long the job sat due but unclaimed; retries count from their backoff time
+        metrics.registry.observe_job(job.kind, outcome, max(started - job.run_at, 0.0), finished - started)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": JOBS_ENABLED,
+            "workers": self.workers if self._dispatcher is not None else 0,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "pruned": self.pruned,
+        }
+
+job_queue = JobQueue()
@@ -1,13 +1,30 @@
 # backend/app/main.py - Modified for SQLite local development
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+import logging
+import time
+
+# Time spent importing the application modules, reported in /health
+_import_started = time.perf_counter()
 
 # Import SQLite database configuration
-from .database_sqlite import get_db, create_all_tables, health_check
-from . import crud, schemas, auth
+from .database_sqlite import (
+    get_db, create_all_tables, health_check, close_database_connections, engine, read_engine
+)
+from . import crud, schemas, auth, search, catalog_io, conditional, fastpath, recommendations, bootstrap, analytics
+from .cache import catalog_cache, principal_cache
+from . import metrics, jobs
+from . import fulfillment  # noqa: F401  (registers the order job handlers)
+from . import invalidation, profiling, warmup
+from .admission import AdmissionRejected, admission, retry_after_header
+
+logger = logging.getLogger(__name__)
+
+boot = {"ready": False, "import_seconds": round(time.perf_counter() - _import_started, 4)}
 
 # Create FastAPI app
 app = FastAPI(
@@ -24,20 +41,95 @@ origins = [
     "http://127.0.0.1:3000",
 ]
 
+# Added first so it ends up innermost: the profiled endpoint runs in its task
+if profiling.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
 )
 
+# Per-request latency, status and SQL instrumentation
+if metrics.METRICS_ENABLED:
+    metrics.instrument_engines(engine, read_engine)
+    metrics.registry.register_gauges("catalog_cache", catalog_cache.stats)
+    metrics.registry.register_gauges("principal_cache", principal_cache.stats)
+    metrics.registry.register_gauges("hash_pool", lambda: auth.hash_pool.stats())
+    metrics.registry.register_gauges("jobs", jobs.job_queue.stats)
+    metrics.registry.register_gauges("admission", admission.stats)
+    metrics.registry.register_gauges("invalidation", invalidation.bus.stats)
+    metrics.registry.register_gauges("profiler", profiling.profiler.stats)
+
+    @app.middleware("http")
+    async def instrument_requests(request: Request, call_next):
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            response.headers["Server-Timing"] = metrics.server_timing(time.perf_counter() - started, stats)
+            return response
+        finally:
+            route = request.scope.get("route")
+            metrics.registry.observe_request(
+                request.method,
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - started,
+                stats,
+            )
+            metrics.current_request.reset(token)
+
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    await create_all_tables()
+    started = time.perf_counter()
+    boot["migrations"] = await create_all_tables()
+    if invalidation.INVALIDATION_ENABLED:
+        await invalidation.bus.start()
+    if warmup.WARMUP_ENABLED:
+        boot["warmup"] = await warmup.warm_up()
+    if jobs.JOBS_ENABLED:
+        await jobs.job_queue.start()
+    boot["startup_seconds"] = round(time.perf_counter() - started, 4)
+    boot["ready"] = True
+    logger.info(f"Ready: imports {boot['import_seconds']:.3f}s, startup {boot['startup_seconds']:.3f}s, "
+                f"schema version {boot['migrations']['schema_version']}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await jobs.job_queue.stop()
+    await invalidation.bus.stop()
+    auth.hash_pool.shutdown()
+    await close_database_connections()
+
+# Password hashing runs in a bounded pool; shed load quickly when it is full
+@app.exception_handler(auth.HashPoolFull)
+async def hash_pool_full_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+# Auth requests over their rate or concurrency budget are shed before any hashing
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many attempts, please retry later"},
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
 
 # Helper function to get current user
 async def get_current_user(
@@ -45,22 +137,44 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db)
 ):
     token = credentials.credentials
-    payload = auth.decode_access_token(token)
+    payload = auth.decode_access_token_cached(token)
     if not payload or 'sub' not in payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
         )
     
-    email = payload['sub']
-    user = await crud.get_user_by_email(db, email)
+    # Served from the principal cache on the warm path, no database round-trip
+    user = await crud.get_principal(db, str(payload['sub']))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
     return user
 
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_db)
+):
+    """The current user when a bearer token is sent, None for anonymous requests."""
+    if credentials is None:
+        return None
+    return await get_current_user(credentials, db)
+
+async def get_current_admin(current_user: schemas.UserRead = Depends(get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
 # Root endpoint
 @app.get("/", tags=["root"])
 async def read_root():
@@ -74,29 +188,55 @@ async def read_root():
 
 # Health check endpoint
 @app.get("/health", tags=["health"])
-async def health_check_route():
+async def health_check_route(response: Response):
+    if not boot["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting", "boot": boot}
     db_health = await health_check()
     return {
         "status": "healthy",
+        "boot": boot,
         "message": "API is working",
-        "database": db_health
+        "database": db_health,
+        "catalog_cache": catalog_cache.stats(),
+        "hash_pool": auth.hash_pool.stats(),
+        "principal_cache": principal_cache.stats(),
+        "jobs": jobs.job_queue.stats(),
+        "admission": admission.stats(),
+        "invalidation": invalidation.bus.stats(),
+        "profiler": profiling.profiler.stats()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["health"])
+async def metrics_route():
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Auth routes
 @app.post("/api/register", response_model=schemas.UserRead, tags=["auth"])
-async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
-    db_user = await crud.get_user_by_email(db, user.email)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    return await crud.create_user(db, user)
+async def register(user: schemas.UserCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    async with admission.admit(request, "register", user.email):
+        db_user = await crud.get_user_by_email(db, user.email)
+        if db_user:
+            raise HTTPException(status_code=400, detail="Email already registered")
+        return await crud.create_user(db, user)
 
 @app.post("/api/login", tags=["auth"])
-async def login(user: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
-    db_user = await crud.get_user_by_email(db, user.email)
-    if not db_user or not auth.verify_password(user.password, db_user.hashed_password):
+async def login(user: schemas.UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
+    async with admission.admit(request, "login", user.email):
+        db_user = await crud.get_user_by_email(db, user.email)
+        if not db_user:
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        valid, new_hash = await auth.verify_and_update_password_async(user.password, db_user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
+    if new_hash:
+        # Stored hash used an older cost factor or scheme, upgrade it transparently
+        await crud.update_user_password_hash(db, db_user, new_hash)
     
-    token = auth.create_access_token({"sub": db_user.email})
+    token = auth.create_access_token({"sub": auth.token_subject(db_user)})
     return {
         "access_token": token, 
         "token_type": "bearer", 
@@ -111,24 +251,276 @@ async def login(user: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
 async def get_me(current_user: schemas.UserRead = Depends(get_current_user)):
     return current_user
 
+@app.get(
+    "/api/bootstrap",
+    response_model=schemas.BootstrapRead,
+    response_model_exclude_unset=True,
+    tags=["auth"],
+)
+async def get_bootstrap(
+    fields: str = Query(
+        ",".join(bootstrap.DEFAULT_FIELDS),
+        description="comma-separated: user,cart,orders,order_history,courses",
+    ),
+    course_limit: int = Query(20, ge=1, le=100),
+    order_limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.UserRead = Depends(get_current_user)
+):
+    """User, cart, orders and optionally a catalog page in one round trip."""
+    try:
+        selected = bootstrap.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await bootstrap.load_bootstrap(
+        current_user, selected, course_limit=course_limit, order_limit=order_limit
+    )
+
 # Course routes
 @app.get("/api/courses", response_model=List[schemas.CourseRead], tags=["courses"])
-async def get_courses(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await crud.get_courses(db, skip=skip, limit=limit)
+async def get_courses(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    after: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    if skip and (sort is not None or after is not None):
+        raise HTTPException(status_code=400, detail="skip cannot be combined with cursor pagination")
+    # Taken before loading so a concurrent write can only make the tag stale, never wrong
+    catalog_revision = await crud.get_catalog_revision(db)
+    etag = conditional.catalog_etag(catalog_revision)
+    if conditional.etag_matches(if_none_match, etag):
+        return conditional.not_modified(etag, conditional.CATALOG_CACHE_CONTROL)
+    if fastpath.ENABLED:
+        try:
+            fast_response = await fastpath.catalog_response(
+                request, db, skip=skip, limit=limit, sort=sort, order=order, after=after
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return conditional.with_etag(fast_response, etag, conditional.CATALOG_CACHE_CONTROL)
+    conditional.with_etag(response, etag, conditional.CATALOG_CACHE_CONTROL)
+    # Legacy offset pagination unless the client asks for a sort or passes a cursor
+    if sort is None and after is None:
+        return await crud.get_courses_cached(db, skip=skip, limit=limit)
+    try:
+        courses, next_cursor = await crud.get_courses_page_cached(
+            db, limit=limit, sort=sort, order=order, after=after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return courses
+
+@app.get("/api/courses/search", response_model=schemas.CourseSearchResult, tags=["courses"])
+async def search_courses(
+    q: Optional[str] = None,
+    level: Optional[str] = None,
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    return await search.search_courses(
+        db, q=q, level=level, category_id=category_id,
+        min_price=min_price, max_price=max_price, limit=limit, offset=offset
+    )
+
+@app.get("/api/courses/top-rated", response_model=List[schemas.CourseRead], tags=["courses"])
+async def get_top_rated_courses(
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    min_reviews: int = Query(1, ge=1),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    catalog_revision = await crud.get_catalog_revision(db)
+    etag = conditional.catalog_etag(catalog_revision)
+    if conditional.etag_matches(if_none_match, etag):
+        return conditional.not_modified(etag, conditional.CATALOG_CACHE_CONTROL)
+    conditional.with_etag(response, etag, conditional.CATALOG_CACHE_CONTROL)
+    return await crud.get_top_rated_courses_cached(db, limit=limit, min_reviews=min_reviews)
 
 @app.get("/api/courses/{course_id}", response_model=schemas.CourseRead, tags=["courses"])
-async def get_course(course_id: int, db: AsyncSession = Depends(get_db)):
-    course = await crud.get_course_by_id(db, course_id)
+async def get_course(
+    course_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    catalog_revision = await crud.get_catalog_revision(db)
+    etag = conditional.catalog_etag(catalog_revision)
+    # The ETag covers the whole catalog, so check the course exists before answering 304
+    course = await crud.get_course_by_id_cached(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
+    if conditional.etag_matches(if_none_match, etag):
+        return conditional.not_modified(etag, conditional.CATALOG_CACHE_CONTROL)
+    conditional.with_etag(response, etag, conditional.CATALOG_CACHE_CONTROL)
     return course
 
+@app.get("/api/courses/{course_id}/related", response_model=List[schemas.CourseRead], tags=["courses"])
+async def get_related_courses(
+    course_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: Optional[schemas.UserRead] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Courses most often bought together with this one, excluding ones the user already has."""
+    return await recommendations.get_related_courses(
+        db, course_id, user_id=current_user.id if current_user else None, limit=limit
+    )
+
+# Review endpoints
+@app.get("/api/courses/{course_id}/reviews", response_model=List[schemas.ReviewRead], tags=["reviews"])
+async def get_course_reviews(
+    course_id: int,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    return await crud.get_course_reviews(db, course_id, skip=skip, limit=limit)
+
+@app.get("/api/courses/{course_id}/rating", response_model=schemas.RatingSummary, tags=["reviews"])
+async def get_course_rating(course_id: int, db: AsyncSession = Depends(get_db)):
+    summary = await crud.get_rating_summary(db, course_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return summary
+
+@app.post("/api/courses/{course_id}/reviews", response_model=schemas.ReviewRead, tags=["reviews"])
+async def create_review(
+    course_id: int,
+    review: schemas.ReviewCreate,
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await crud.create_review(db, current_user.id, course_id, review)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.put("/api/reviews/{review_id}", response_model=schemas.ReviewRead, tags=["reviews"])
+async def update_review(
+    review_id: int,
+    review: schemas.ReviewUpdate,
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    updated = await crud.update_review(db, current_user.id, review_id, review)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return updated
+
+@app.delete("/api/reviews/{review_id}", tags=["reviews"])
+async def delete_review(
+    review_id: int,
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if not await crud.delete_review(db, current_user.id, review_id):
+        raise HTTPException(status_code=404, detail="Review not found")
+    return {"message": "Review deleted"}
+
+# Admin catalog management
+@app.post("/api/admin/courses/import", response_model=schemas.CourseImportReport, tags=["admin"])
+async def import_courses(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    mode: str = Query("upsert", pattern="^(upsert|insert)$"),
+    chunk_size: int = Query(catalog_io.DEFAULT_CHUNK_SIZE, ge=1, le=5000),
+    admin: schemas.UserRead = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import NDJSON or CSV course records streamed in the request body."""
+    records = catalog_io.parse_records(catalog_io.iter_lines(request.stream()), format)
+    return await catalog_io.import_courses(db, records, mode=mode, chunk_size=chunk_size)
+
+@app.get("/api/admin/courses/export", tags=["admin"])
+async def export_courses(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    include_inactive: bool = False,
+    admin: schemas.UserRead = Depends(get_current_admin)
+):
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        catalog_io.export_courses(format, include_inactive=include_inactive),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="courses.{format}"'}
+    )
+
+# Sales analytics, answered from the daily rollup tables
+DAY_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+@app.get("/api/admin/analytics/revenue", response_model=List[schemas.RevenueTotal], tags=["admin"])
+async def get_revenue_totals(
+    dimension: str = Query("course", pattern="^(total|course|instructor|level)$"),
+    start: Optional[str] = Query(None, pattern=DAY_PATTERN),
+    end: Optional[str] = Query(None, pattern=DAY_PATTERN),
+    limit: int = Query(20, ge=1, le=500),
+    admin: schemas.UserRead = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    return await analytics.revenue_totals(db, dimension, start=start, end=end, limit=limit)
+
+@app.get("/api/admin/analytics/daily", response_model=List[schemas.DailyRevenue], tags=["admin"])
+async def get_daily_revenue(
+    dimension: str = Query("total", pattern="^(total|course|instructor|level)$"),
+    key: str = "",
+    start: Optional[str] = Query(None, pattern=DAY_PATTERN),
+    end: Optional[str] = Query(None, pattern=DAY_PATTERN),
+    admin: schemas.UserRead = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    return await analytics.daily_revenue(db, dimension, key, start=start, end=end)
+
+@app.get("/api/admin/analytics/verify", response_model=schemas.RollupVerification, tags=["admin"])
+async def verify_analytics(
+    start: Optional[str] = Query(None, pattern=DAY_PATTERN),
+    end: Optional[str] = Query(None, pattern=DAY_PATTERN),
+    admin: schemas.UserRead = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Reconcile the rollups with orders / order_items (scans the raw tables)."""
+    return await analytics.verify_rollups(db, start=start, end=end)
+
+# Request profiles written by the sampling profiler (PROFILING_ENABLED)
+@app.get("/api/admin/profiles", response_model=List[schemas.ProfileRead], tags=["admin"])
+async def list_profiles(admin: schemas.UserRead = Depends(get_current_admin)):
+    return profiling.profiler.list_profiles()
+
+@app.get("/api/admin/profiles/{name}", response_class=PlainTextResponse, tags=["admin"])
+async def get_profile(name: str, admin: schemas.UserRead = Depends(get_current_admin)):
+    """Collapsed stacks, one "frame;frame;... count" line each (flamegraph.pl, speedscope)."""
+    profile = profiling.profiler.read_profile(name)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile, headers={"Content-Disposition": f'attachment; filename="{name}"'})
+
 # Cart routes
 @app.get("/api/cart", response_model=List[schemas.CartItemRead], tags=["cart"])
 async def get_cart(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: schemas.UserRead = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    cart_revision, _ = await crud.get_user_revisions(db, current_user.id)
+    catalog_revision = await crud.get_catalog_revision(db)
+    etag = conditional.cart_etag(current_user.id, cart_revision, catalog_revision)
+    if conditional.etag_matches(if_none_match, etag):
+        return conditional.not_modified(etag, conditional.USER_CACHE_CONTROL)
+    if fastpath.ENABLED:
+        fast_response = await fastpath.cart_response(db, current_user.id)
+        return conditional.with_etag(fast_response, etag, conditional.USER_CACHE_CONTROL)
+    conditional.with_etag(response, etag, conditional.USER_CACHE_CONTROL)
     return await crud.get_user_cart(db, current_user.id)
 
 @app.post("/api/cart", tags=["cart"])
@@ -143,6 +535,31 @@ async def add_to_cart(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/api/cart/summary", response_model=schemas.CartSummary, tags=["cart"])
+async def get_cart_summary(
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Item count and total for the nav-bar badge without loading the cart's courses."""
+    return await crud.get_cart_summary(db, current_user.id)
+
+# Batch routes are declared before /api/cart/{cart_item_id} so "batch" is not parsed as an id
+@app.post("/api/cart/batch", response_model=schemas.CartBatchAddResult, tags=["cart"])
+async def add_to_cart_batch(
+    batch: schemas.CartBatchRequest,
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await crud.add_to_cart_batch(db, current_user.id, batch.course_ids)
+
+@app.delete("/api/cart/batch", response_model=schemas.CartBatchRemoveResult, tags=["cart"])
+async def remove_from_cart_batch(
+    batch: schemas.CartBatchRequest,
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await crud.remove_from_cart_batch(db, current_user.id, batch.course_ids)
+
 @app.delete("/api/cart/{cart_item_id}", tags=["cart"])
 async def remove_from_cart(
     cart_item_id: int,
@@ -157,17 +574,65 @@ async def remove_from_cart(
 # Order routes
 @app.post("/api/orders", response_model=schemas.OrderRead, tags=["orders"])
 async def create_order(
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: schemas.UserRead = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        return await crud.create_order_from_cart(db, current_user.id)
+        return await crud.create_order_from_cart(db, current_user.id, idempotency_key=idempotency_key)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/orders", response_model=List[schemas.OrderRead], tags=["orders"])
 async def get_orders(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: schemas.UserRead = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    """Full order history with line items; prefer /api/orders/history for large histories."""
+    _, orders_revision = await crud.get_user_revisions(db, current_user.id)
+    catalog_revision = await crud.get_catalog_revision(db)
+    etag = conditional.orders_etag(current_user.id, orders_revision, catalog_revision)
+    if conditional.etag_matches(if_none_match, etag):
+        return conditional.not_modified(etag, conditional.USER_CACHE_CONTROL)
+    if fastpath.ENABLED:
+        fast_response = await fastpath.orders_response(db, current_user.id)
+        return conditional.with_etag(fast_response, etag, conditional.USER_CACHE_CONTROL)
+    conditional.with_etag(response, etag, conditional.USER_CACHE_CONTROL)
     return await crud.get_user_orders(db, current_user.id)
+
+# Declared before /api/orders/{order_id} so "history" is not parsed as an id
+@app.get("/api/orders/history", response_model=List[schemas.OrderSummary], tags=["orders"])
+async def get_order_history(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Order summaries, newest first; pass X-Next-Cursor back as `after` for the next page."""
+    _, orders_revision = await crud.get_user_revisions(db, current_user.id)
+    etag = conditional.order_history_etag(current_user.id, orders_revision, after, limit)
+    if conditional.etag_matches(if_none_match, etag):
+        return conditional.not_modified(etag, conditional.USER_CACHE_CONTROL)
+    try:
+        summaries, next_cursor = await crud.get_user_order_summaries(db, current_user.id, limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    conditional.with_etag(response, etag, conditional.USER_CACHE_CONTROL)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return summaries
+
+@app.get("/api/orders/{order_id}", response_model=schemas.OrderRead, tags=["orders"])
+async def get_order(
+    order_id: int,
+    current_user: schemas.UserRead = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    order = await crud.get_user_order(db, current_user.id, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
@@ -0,0 +1,199 @@
+# backend/app/metrics.py - request/SQL instrumentation exposed in Prometheus text format
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+from . import env  # noqa: F401  (loads .env.local)
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+# A statement repeated this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            yield bound, running
+
+@dataclass
+class RequestStats:
+    """SQL activity attributed to the request currently being handled."""
+    statements: int = 0
+    db_seconds: float = 0.0
+    by_statement: Counter = field(default_factory=Counter)
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+LabelKey = Tuple[str, str]  # (method, route)
+
+class MetricsRegistry:
+    def __init__(self):
+        self.request_latency: Dict[LabelKey, Histogram] = {}
+        self.request_statements: Dict[LabelKey, Histogram] = {}
+        self.requests_total: Counter = Counter()  # (method, route, status)
+        self.db_statements_total: Counter = Counter()
+        self.db_seconds_total: Dict[LabelKey, float] = defaultdict(float)
+        self.n_plus_one_total: Counter = Counter()
+        self.slow_queries_total = 0
+        self.job_wait: Dict[Tuple[str], Histogram] = {}
+        self.job_run: Dict[Tuple[str], Histogram] = {}
+        self.jobs_total: Counter = Counter()  # (kind, outcome)
+        self.gauge_sources: Dict[str, Callable[[], dict]] = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        self.request_latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+        self.request_statements.setdefault(key, Histogram(STATEMENT_BUCKETS)).observe(stats.statements)
+        self.requests_total[(method, route, str(status))] += 1
+        self.db_statements_total[key] += stats.statements
+        self.db_seconds_total[key] += stats.db_seconds
+
+        repeated = [(sql, n) for sql, n in stats.by_statement.items() if n >= N_PLUS_ONE_THRESHOLD]
+        if repeated:
+            self.n_plus_one_total[key] += 1
+            sql, n = max(repeated, key=lambda item: item[1])
+            logger.warning(f"Possible N+1 in {method} {route}: statement ran {n} times: {_short(sql)}")
+
+    def observe_job(self, kind: str, outcome: str, wait_seconds: float, run_seconds: float) -> None:
+        self.job_wait.setdefault((kind,), Histogram(LATENCY_BUCKETS)).observe(wait_seconds)
+        self.job_run.setdefault((kind,), Histogram(LATENCY_BUCKETS)).observe(run_seconds)
+        self.jobs_total[(kind, outcome)] += 1
+
+    def register_gauges(self, prefix: str, source: Callable[[], dict]) -> None:
+        """Expose the numeric values of ``source()`` as ``<prefix>_<key>`` gauges."""
+        self.gauge_sources[prefix] = source
+
+    def render(self) -> str:
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, help_text, series, label_names=("method", "route")):
+            header(name, "histogram", help_text)
+            for label_values, hist in sorted(series.items()):
+                labels = ",".join(f'{label}="{value}"' for label, value in zip(label_names, label_values))
+                for bound, count in hist.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        histogram("http_request_duration_seconds", "Request latency by route.", self.request_latency)
+        histogram("http_request_db_statements", "SQL statements issued per request.", self.request_statements)
+
+        header("http_requests_total", "counter", "Requests by route and status code.")
+        for (method, route, status), count in sorted(self.requests_total.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        header("db_statements_total", "counter", "SQL statements issued while serving each route.")
+        for (method, route), count in sorted(self.db_statements_total.items()):
+            lines.append(f'db_statements_total{{method="{method}",route="{route}"}} {count}')
+
+        header("db_time_seconds_total", "counter", "Time spent executing SQL while serving each route.")
+        for (method, route), seconds in sorted(self.db_seconds_total.items()):
+            lines.append(f'db_time_seconds_total{{method="{method}",route="{route}"}} {seconds}')
+
+        header("db_n_plus_one_requests_total", "counter", "Requests that repeated one statement suspiciously often.")
+        for (method, route), count in sorted(self.n_plus_one_total.items()):
+            lines.append(f'db_n_plus_one_requests_total{{method="{method}",route="{route}"}} {count}')
+
+        header("db_slow_queries_total", "counter", f"Statements slower than {SLOW_QUERY_MS} ms.")
+        lines.append(f"db_slow_queries_total {self.slow_queries_total}")
+
+        histogram("job_wait_seconds", "Time a due background job waited for a worker.", self.job_wait, ("kind",))
+        histogram("job_run_seconds", "Background job handler duration.", self.job_run, ("kind",))
+        header("jobs_total", "counter", "Background job attempts by outcome (done, retry, failed).")
+        for (kind, outcome), count in sorted(self.jobs_total.items()):
+            lines.append(f'jobs_total{{kind="{kind}",outcome="{outcome}"}} {count}')
+
+        for prefix, source in sorted(self.gauge_sources.items()):
+            for key, value in sorted(source().items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+def _short(statement: str, limit: int = 200) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+def _explain(conn, statement: str, parameters) -> str:
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return "; ".join(str(row[-1]) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:  # never let diagnostics break the request
+        return f"<plan unavailable: {e}>"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Statements on one connection never overlap, so a single slot is enough
+    conn.info["query_start"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        stats.by_statement[statement] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        registry.slow_queries_total += 1
+        plan = ""
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            plan = f" | plan: {_explain(conn, statement, parameters)}"
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {_short(statement)}{plan}")
+
+def instrument_engines(*engines) -> None:
+    """Attach the SQL timing listeners to each (async) engine once."""
+    for engine in dict.fromkeys(engine.sync_engine for engine in engines):
+        if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            continue
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def server_timing(total_seconds: float, stats: RequestStats) -> str:
+    """Server-Timing header splitting DB time from handler + serialization time."""
+    db_ms = stats.db_seconds * 1000
+    total_ms = total_seconds * 1000
+    return (
+        f'db;dur={db_ms:.2f};desc="SQL x{stats.statements}", '
+        f'app;dur={max(total_ms - db_ms, 0):.2f};desc="handler+serialization", '
+        f"total;dur={total_ms:.2f}"
+    )
@@ -0,0 +1,203 @@
+# backend/app/migrations.py - versioned schema migrations
+#
+# The schema version lives in the `schema_version` table. Boot reads it with
+# one query; only when it is behind do we take SQLite's write lock
+# (BEGIN IMMEDIATE), re-check, and apply the missing migrations in order in
+# that same transaction, so concurrently starting workers apply each
+# migration exactly once.
+#
+# Version 1 is the schema frozen in schema_v1.py: it creates that schema on
+# fresh databases and brings databases created by earlier releases (which ran
+# create_all on every boot) up to it. Every later model change needs its own
+# migration at the end of MIGRATIONS.
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import inspect, text
+
+from .models import CacheInvalidation, CatalogState
+from .schema_v1 import V1_ADDED_COLUMNS, V1_INDEXES, V1_SEARCH_DDL, V1_TABLES
+
+logger = logging.getLogger(__name__)
+
+# How long a starting worker waits for another one that is migrating
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "120000"))
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable  # (sync connection) -> None
+
+def _dedupe_cart_items(sync_conn) -> None:
+    """Keep the first row of each (user, course) pair so unique_user_course_cart can be created.
+
+    Releases before that index let concurrent add-to-cart requests insert the same course twice.
+    """
+    result = sync_conn.execute(text(
+        "DELETE FROM cart_items WHERE id NOT IN "
+        "(SELECT MIN(id) FROM cart_items GROUP BY user_id, course_id)"
+    ))
+    if result.rowcount:
+        logger.info(f"Removed {result.rowcount} duplicate cart items")
+
+def _dedupe_reviews(sync_conn) -> int:
+    """Keep each user's first review of a course so unique_user_course_review can be created."""
+    result = sync_conn.execute(text(
+        "DELETE FROM reviews WHERE id NOT IN "
+        "(SELECT MIN(id) FROM reviews GROUP BY course_id, user_id)"
+    ))
+    if result.rowcount:
+        logger.info(f"Removed {result.rowcount} duplicate reviews")
+    return result.rowcount
+
+def _rebuild_rating_aggregates(sync_conn) -> None:
+    """Recompute the courses.rating_* columns from reviews (same as `cli rebuild-ratings` at version 1)."""
+    sync_conn.execute(text(
+        "UPDATE courses SET rating_count = 0, rating_sum = 0, rating_avg = 0, "
+        "rating_1 = 0, rating_2 = 0, rating_3 = 0, rating_4 = 0, rating_5 = 0"
+    ))
+    sync_conn.execute(text("""
+        UPDATE courses SET
+            rating_count = agg.n, rating_sum = agg.total, rating_avg = agg.total * 1.0 / agg.n,
+            rating_1 = agg.r1, rating_2 = agg.r2, rating_3 = agg.r3, rating_4 = agg.r4, rating_5 = agg.r5
+        FROM (
+            SELECT course_id, COUNT(*) AS n, SUM(rating) AS total,
+                   SUM(rating = 1) AS r1, SUM(rating = 2) AS r2, SUM(rating = 3) AS r3,
+                   SUM(rating = 4) AS r4, SUM(rating = 5) AS r5
+            FROM reviews GROUP BY course_id
+        ) AS agg
+        WHERE courses.id = agg.course_id
+    """))
+
+def _baseline(sync_conn) -> None:
+    for statement in V1_TABLES:
+        sync_conn.execute(text(statement))
+    columns, added = {}, set()
+    for table, column, ddl in V1_ADDED_COLUMNS:
+        if table not in columns:
+            columns[table] = {c["name"] for c in inspect(sync_conn).get_columns(table)}
+        if column not in columns[table]:
+            sync_conn.execute(text(f'ALTER TABLE {table} ADD COLUMN "{column}" {ddl}'))
+            added.add(f"{table}.{column}")
+    _dedupe_cart_items(sync_conn)
+    # Aggregates are stale after removing duplicates, and all zero when the columns are new
+    if _dedupe_reviews(sync_conn) or "courses.rating_count" in added:
+        _rebuild_rating_aggregates(sync_conn)
+    for statement in V1_INDEXES:
+        sync_conn.execute(text(statement))
+    search_exists = sync_conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'courses_fts'")
+    ).first()
+    for statement in V1_SEARCH_DDL:
+        sync_conn.execute(text(statement))
+    if not search_exists:
+        # Index the courses that were there before the search table
+        sync_conn.execute(text("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')"))
+
+def create_table(model) -> Callable:
+    """Migration step creating a model's table (and its indexes) if missing."""
+    def apply(sync_conn) -> None:
+        model.__table__.create(sync_conn, checkfirst=True)
+    return apply
+
+def _cart_summary(sync_conn) -> None:
+    existing = {column["name"] for column in inspect(sync_conn).get_columns("users")}
+    for column, ddl in (("cart_item_count", "INTEGER DEFAULT 0"), ("cart_total", "FLOAT DEFAULT 0")):
+        if column not in existing:
+            sync_conn.execute(text(f'ALTER TABLE users ADD COLUMN "{column}" {ddl}'))
+    # Backfill non-empty carts, priced like checkout (cart_items joined to courses)
+    sync_conn.execute(text("""
+        UPDATE users SET
+            cart_item_count = (
+                SELECT COUNT(*) FROM cart_items JOIN courses ON courses.id = cart_items.course_id
+                WHERE cart_items.user_id = users.id
+            ),
+            cart_total = (
+                SELECT COALESCE(SUM(courses.price), 0.0) FROM cart_items JOIN courses ON courses.id = cart_items.course_id
+                WHERE cart_items.user_id = users.id
+            )
+        WHERE users.id IN (SELECT user_id FROM cart_items)
+    """))
+
+def _catalog_state(sync_conn) -> None:
+    create_table(CatalogState)(sync_conn)
+    sync_conn.execute(text("INSERT OR IGNORE INTO catalog_state (id, version) VALUES (1, 0)"))
+
+def _review_updated_at(sync_conn) -> None:
+    # Missing where migration 1 ran before reviews.updated_at was in V1_ADDED_COLUMNS
+    existing = {column["name"] for column in inspect(sync_conn).get_columns("reviews")}
+    if "updated_at" not in existing:
+        sync_conn.execute(text('ALTER TABLE reviews ADD COLUMN "updated_at" DATETIME'))
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline", _baseline),
+    Migration(2, "cache_invalidations", create_table(CacheInvalidation)),
+    Migration(3, "cart_summary", _cart_summary),
+    Migration(4, "catalog_state", _catalog_state),
+    Migration(5, "review_updated_at", _review_updated_at),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+def _current_version(sync_conn) -> int:
+    exists = sync_conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    ).first()
+    if not exists:
+        return 0
+    return sync_conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+def _migrate_locked(sync_conn) -> List[str]:
+    busy_timeout = sync_conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+    sync_conn.exec_driver_sql(f"PRAGMA busy_timeout = {MIGRATION_LOCK_TIMEOUT_MS}")
+    # Explicit BEGIN IMMEDIATE: take the write lock now, and keep the DDL transactional
+    sync_conn.exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        version = _current_version(sync_conn)  # another worker may have migrated meanwhile
+        sync_conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            started = time.perf_counter()
+            migration.apply(sync_conn)
+            sync_conn.execute(
+                text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name},
+            )
+            logger.info(f"Applied migration {migration.version} ({migration.name}) "
+                        f"in {time.perf_counter() - started:.3f}s")
+            applied.append(f"{migration.version}:{migration.name}")
+        sync_conn.exec_driver_sql("COMMIT")
+        return applied
+    except BaseException:
+        sync_conn.exec_driver_sql("ROLLBACK")
+        raise
+    finally:
+        sync_conn.exec_driver_sql(f"PRAGMA busy_timeout = {busy_timeout}")
+
+async def migrate(engine=None) -> dict:
+    """Bring the schema to LATEST_VERSION; a single version check when it is current."""
+    if engine is None:
+        from .database_sqlite import engine
+    started = time.perf_counter()
+    async with engine.connect() as conn:
+        version = await conn.run_sync(_current_version)
+        applied = []
+        if version < LATEST_VERSION:
+            applied = await conn.run_sync(_migrate_locked)
+    if version > LATEST_VERSION:
+        logger.warning(f"Database schema version {version} is newer than this code ({LATEST_VERSION})")
+    return {
+        "schema_version": max(version, LATEST_VERSION),
+        "previous_version": version,
+        "applied": applied,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
@@ -1,7 +1,7 @@
 # backend/app/models.py
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime
 from .database_sqlite import Base
 
@@ -13,6 +13,13 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    is_admin = Column(Boolean, default=False, server_default=text("0"))
+    # Bumped by every cart / order mutation; used as cheap ETag markers
+    cart_revision = Column(Integer, default=0, server_default=text("0"))
+    orders_revision = Column(Integer, default=0, server_default=text("0"))
+    # Cart summary, recounted by the same UPDATE that bumps cart_revision
+    cart_item_count = Column(Integer, default=0, server_default=text("0"))
+    cart_total = Column(Float, default=0.0, server_default=text("0"))
     created_at = Column(DateTime, default=func.now())
     
     # Relationships
@@ -33,12 +40,33 @@ class Course(Base):
     duration = Column(String)  # e.g., "4 weeks"
     level = Column(String)     # e.g., "Beginner", "Intermediate", "Advanced"
     image_url = Column(String)
+    external_id = Column(String, unique=True, index=True)  # Natural key used by bulk import
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     
+    # Review aggregates, maintained by the review CRUD in the same transaction
+    rating_count = Column(Integer, default=0, server_default=text("0"))
+    rating_sum = Column(Integer, default=0, server_default=text("0"))
+    rating_avg = Column(Float, default=0.0, server_default=text("0"))  # 0 when unrated
+    rating_1 = Column(Integer, default=0, server_default=text("0"))
+    rating_2 = Column(Integer, default=0, server_default=text("0"))
+    rating_3 = Column(Integer, default=0, server_default=text("0"))
+    rating_4 = Column(Integer, default=0, server_default=text("0"))
+    rating_5 = Column(Integer, default=0, server_default=text("0"))
+    
+    # Composite indexes backing keyset pagination of the active catalog
+    __table_args__ = (
+        Index("ix_courses_active_created_at", "is_active", "created_at", "id"),
+        Index("ix_courses_active_price", "is_active", "price", "id"),
+        Index("ix_courses_active_title", "is_active", "title", "id"),
+        Index("ix_courses_active_rating", "is_active", "rating_avg", "id"),
+    )
+    
     # Relationships
     order_items = relationship("OrderItem", back_populates="course")
     cart_items = relationship("CartItem", back_populates="course")
+    category = relationship("Category")
 
     def __repr__(self):
         return f"<Course(id={self.id}, title='{self.title}', price={self.price})>"
@@ -51,6 +79,13 @@ class Order(Base):
     total_amount = Column(Float, nullable=False)
     status = Column(String, default="pending")  # pending, completed, cancelled
     created_at = Column(DateTime, default=func.now())
+    idempotency_key = Column(String)  # Client-supplied key so retried checkouts reuse the order
+    
+    __table_args__ = (
+        Index("ix_orders_user_idempotency_key", "user_id", "idempotency_key", unique=True),
+        # Keyset pagination of a user's order history, newest first
+        Index("ix_orders_user_created_at", "user_id", "created_at", "id"),
+    )
     
     # Relationships
     user = relationship("User", back_populates="orders")
@@ -63,7 +98,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"))
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), index=True)
     course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"))
     price = Column(Float, nullable=False)  # Price at time of purchase
     
@@ -82,9 +117,10 @@ class CartItem(Base):
     course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"))
     created_at = Column(DateTime, default=func.now())
     
-    # Unique constraint to prevent duplicate cart items
+    # Unique index to prevent duplicate cart items; an index rather than a table
+    # constraint so it can also be added to databases created without it
     __table_args__ = (
-        # UniqueConstraint('user_id', 'course_id', name='unique_user_course_cart'),
+        Index("unique_user_course_cart", "user_id", "course_id", unique=True),
     )
     
     # Relationships
@@ -119,6 +155,13 @@ class Review(Base):
     rating = Column(Integer, nullable=False)  # 1-5 stars
     comment = Column(Text)
     created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime)
+    
+    # One review per user and course; the second index serves per-course listings
+    __table_args__ = (
+        Index("unique_user_course_review", "course_id", "user_id", unique=True),
+        Index("ix_reviews_course_created_at", "course_id", "created_at", "id"),
+    )
     
     # Relationships
     course = relationship("Course")
@@ -127,6 +170,94 @@ class Review(Base):
     def __repr__(self):
         return f"<Review(id={self.id}, course_id={self.course_id}, user_id={self.user_id}, rating={self.rating})>"
 
+class CoursePair(Base):
+    """How many orders contained both courses; stored in both directions"""
+    __tablename__ = "course_copurchases"
+    
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    related_course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    
+    # Top-K lookups for a course are a range scan of this index in count order
+    __table_args__ = (
+        Index("ix_course_copurchases_top", "course_id", "count", "related_course_id"),
+    )
+
+    def __repr__(self):
+        return f"<CoursePair(course_id={self.course_id}, related_course_id={self.related_course_id}, count={self.count})>"
+
+class SalesRollup(Base):
+    """Daily sales of completed orders per course, instructor, level and overall ("total")"""
+    __tablename__ = "sales_daily_rollups"
+    
+    dimension = Column(String, primary_key=True)  # total, course, instructor, level
+    key = Column(String, primary_key=True)        # course id, instructor name, level; "" for total
+    day = Column(String, primary_key=True)        # YYYY-MM-DD of the order
+    orders = Column(Integer, nullable=False, default=0)
+    items = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    
+    # The primary key serves per-key series; this index serves range totals per dimension
+    __table_args__ = (
+        Index("ix_sales_daily_rollups_dimension_day", "dimension", "day"),
+    )
+
+    def __repr__(self):
+        return f"<SalesRollup(dimension='{self.dimension}', key='{self.key}', day='{self.day}', revenue={self.revenue})>"
+
+class Job(Base):
+    """Persistent background job; times are epoch seconds so they compare exactly"""
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)     # handler name, e.g. "order.process"
+    payload = Column(Text, nullable=False)    # JSON
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(Float, nullable=False)    # not before this time (retry backoff)
+    locked_until = Column(Float)              # lease of the worker running it
+    enqueued_at = Column(Float, nullable=False)
+    finished_at = Column(Float)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=func.now())
+    
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', status='{self.status}', attempts={self.attempts})>"
+
+class CacheInvalidation(Base):
+    """Change-log entry telling every worker to evict cached data (see invalidation.py)"""
+    __tablename__ = "cache_invalidations"
+
+    # AUTOINCREMENT: ids never go backwards, even after old entries are pruned
+    id = Column(Integer, primary_key=True)
+    topic = Column(String, nullable=False)    # what to evict, e.g. "catalog" or "principal"
+    key = Column(String)                      # which entry within the topic; NULL for all of it
+    origin = Column(String, nullable=False)   # worker that wrote it, which already evicted locally
+    created_at = Column(Float, nullable=False)  # epoch seconds, for pruning
+
+    __table_args__ = (
+        Index("ix_cache_invalidations_created_at", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
+
+    def __repr__(self):
+        return f"<CacheInvalidation(id={self.id}, topic='{self.topic}', key='{self.key}')>"
+
+class CatalogState(Base):
+    """Single row (id 1) whose version is bumped by every catalog write; catalog ETags are built from it"""
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
+    def __repr__(self):
+        return f"<CatalogState(version={self.version})>"
+
 # Export all models
 __all__ = [
     "Base",
@@ -137,4 +268,9 @@ __all__ = [
     "CartItem",
     "Category",
     "Review",
+    "CacheInvalidation",
+    "CatalogState",
+    "CoursePair",
+    "SalesRollup",
+    "Job",
 ]
\ No newline at end of file
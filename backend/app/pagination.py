@@ -0,0 +1,54 @@
+# backend/app/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+# Sort keys allowed for keyset pagination over the course catalog, mapped to Course columns
+COURSE_SORT_FIELDS = {
+    "created_at": "created_at",
+    "price": "price",
+    "title": "title",
+    "rating": "rating_avg",
+}
+SORT_ORDERS = ("asc", "desc")
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _decode_value(sort: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if sort == "created_at":
+        return datetime.fromisoformat(value)
+    if sort in ("price", "rating"):
+        return float(value)
+    return str(value)
+
+def encode_cursor(sort: str, order: str, sort_value: Any, last_id: int) -> str:
+    """Build an opaque cursor pointing just after the given (sort key, id)."""
+    raw = json.dumps([sort, order, _encode_value(sort_value), last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, int]:
+    """Return (sort value, id) from a cursor, validating it matches the requested sort."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        value = _decode_value(cursor_sort, value)
+        last_id = int(last_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or cursor_order != order:
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, last_id
+
+def validate_sort(sort: Optional[str], order: str) -> Tuple[str, str]:
+    sort = sort or "created_at"
+    if sort not in COURSE_SORT_FIELDS:
+        raise ValueError(f"Unsupported sort field: {sort}")
+    if order not in SORT_ORDERS:
+        raise ValueError(f"Unsupported sort order: {order}")
+    return sort, order
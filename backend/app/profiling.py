@@ -0,0 +1,238 @@
+# backend/app/profiling.py - on-demand sampling profiler for live requests
+#
+# With PROFILING_ENABLED a pure ASGI middleware sits right above the router,
+# so the handler and its dependencies run in the request's own task. A
+# request is profiled when it is sampled (PROFILE_SAMPLE_RATE) or carries
+# the secret X-Profile header. While any profile is active, a daemon thread
+# wakes every PROFILE_INTERVAL_MS and records the request's stack: the
+# running frames when the task is on the event loop, otherwise the chain of
+# awaits it is suspended in (an executor future for bcrypt, the database
+# driver for a query, ...), so the profile shows where the wall time went.
+# Each profile is written as collapsed stacks (flamegraph.pl / speedscope
+# input) to PROFILE_DIR, keeping the newest PROFILE_RETENTION files.
+#
+# With PROFILING_ENABLED off the middleware is not installed at all.
+import asyncio
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from . import env  # noqa: F401  (loads .env.local)
+from .schemas import ProfileRead
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+# Fraction of all requests to profile; 0 profiles only requests with the header
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Requests sending "X-Profile: <secret>" are always profiled; empty disables the header
+PROFILE_SECRET = os.getenv("PROFILE_SECRET", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_RETENTION = int(os.getenv("PROFILE_RETENTION", "100"))
+
+PROFILE_HEADER = b"x-profile"
+# <epoch ms>+<method>+<route>+<status>+<duration>ms+<samples>.collapsed; "+" never occurs in routes
+PROFILE_NAME = re.compile(r"^(\d+)\+([A-Z]+)\+([\w.{}\-]+)\+(\d+)\+(\d+)ms\+(\d+)\.collapsed$")
+
+def _route_slug(path: str) -> str:
+    return path.strip("/").replace("/", ".") or "."
+
+def _route_path(slug: str) -> str:
+    return "/" if slug == "." else "/" + slug.replace(".", "/")
+
+def _label(frame) -> str:
+    return f"{frame.f_code.co_qualname} ({frame.f_globals.get('__name__', '?')})"
+
+class RequestProfile:
+    def __init__(self, task: asyncio.Task, loop_thread: int):
+        self.task = task
+        self.loop_thread = loop_thread
+        self.loop = task.get_loop()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+
+    def sample(self, thread_frames: Dict[int, object]) -> None:
+        if asyncio.current_task(self.loop) is self.task:
+            frame = thread_frames.get(self.loop_thread)
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            stack = [_label(frame) for frame in reversed(frames)]
+        else:
+            stack = self._suspended_stack()
+        # Keep what ran below the middleware: the event loop and outer middleware are noise
+        try:
+            stack = stack[stack.index(MIDDLEWARE_LABEL) + 1:]
+        except ValueError:
+            pass
+        if stack:
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def _suspended_stack(self) -> List[str]:
+        stack = []
+        awaitable = self.task.get_coro()
+        for _ in range(200):
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                break
+            stack.append(_label(frame))
+            next_awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+            if next_awaitable is None:
+                break
+            awaitable = next_awaitable
+        if awaitable is not None and frame is None:
+            stack.append(f"[await {type(awaitable).__name__}]")
+        return stack
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+class Profiler:
+    def __init__(self):
+        self._active: List[RequestProfile] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.profiled = 0
+
+    def should_profile(self, scope) -> bool:
+        if PROFILE_SECRET:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, PROFILE_SECRET.encode())
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    def begin(self) -> RequestProfile:
+        profile = RequestProfile(asyncio.current_task(), threading.get_ident())
+        with self._lock:
+            self._active.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return profile
+
+    def end(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.remove(profile)
+
+    def _run(self) -> None:
+        interval = PROFILE_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                # Idle until the next profiled request
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            frames = sys._current_frames()
+            for profile in active:
+                try:
+                    profile.sample(frames)
+                except Exception:
+                    logger.debug("Profile sample failed", exc_info=True)
+            del frames
+            time.sleep(interval)
+
+    def save(self, profile: RequestProfile, method: str, route: str, status: int) -> str:
+        duration_ms = int((time.perf_counter() - profile.started) * 1000)
+        name = (f"{int(time.time() * 1000)}+{method}+{_route_slug(route)}+{status}"
+                f"+{duration_ms}ms+{profile.samples}.collapsed")
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(PROFILE_DIR, name), "w") as f:
+            f.write(profile.collapsed())
+        self.profiled += 1
+        self._prune()
+        return name
+
+    def _prune(self) -> None:
+        names = sorted(name for name in os.listdir(PROFILE_DIR) if PROFILE_NAME.match(name))
+        for name in names[:max(0, len(names) - PROFILE_RETENTION)]:
+            try:
+                os.unlink(os.path.join(PROFILE_DIR, name))
+            except FileNotFoundError:
+                pass  # another worker pruned it first
+
+    def list_profiles(self) -> List[ProfileRead]:
+        try:
+            entries = list(os.scandir(PROFILE_DIR))
+        except FileNotFoundError:
+            return []
+        profiles = []
+        for entry in entries:
+            match = PROFILE_NAME.match(entry.name)
+            if not match:
+                continue
+            created, method, slug, status, duration_ms, samples = match.groups()
+            profiles.append(ProfileRead(
+                name=entry.name, method=method, route=_route_path(slug), status=int(status),
+                duration_ms=int(duration_ms), samples=int(samples),
+                created_at=datetime.fromtimestamp(int(created) / 1000), size_bytes=entry.stat().st_size,
+            ))
+        return sorted(profiles, key=lambda p: p.name, reverse=True)
+
+    def read_profile(self, name: str) -> Optional[str]:
+        if not PROFILE_NAME.match(name):
+            return None
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": PROFILING_ENABLED,
+            "sample_rate": PROFILE_SAMPLE_RATE,
+            "active": len(self._active),
+            "profiled": self.profiled,
+        }
+
+profiler = Profiler()
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware; install it innermost so the endpoint runs in this task."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        profile = profiler.begin()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profiler.end(profile)
+            route = scope.get("route")
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, profiler.save, profile, scope["method"],
+                    route.path if route is not None else "unmatched", status,
+                )
+            except OSError:
+                logger.exception("Could not write request profile")
+
+MIDDLEWARE_LABEL = f"{ProfilingMiddleware.__call__.__qualname__} ({__name__})"
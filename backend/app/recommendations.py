@@ -0,0 +1,97 @@
+# backend/app/recommendations.py - "customers also bought" from a co-purchase index
+#
+# course_copurchases holds, for every ordered pair of courses bought together,
+# the number of orders containing both. Checkout bumps the pairs of the new
+# order in its own transaction; rebuild_copurchases recomputes the table from
+# order_items for backfills.
+from collections import Counter
+from itertools import permutations
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, select, union
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from .database_sqlite import AsyncReadSessionLocal
+from .models import CartItem, Course, CoursePair, Order, OrderItem
+
+DEFAULT_BATCH_SIZE = 1000
+
+async def record_order_pairs(db: AsyncSession, order_id: int) -> None:
+    """Count every pair of courses in one order with a single INSERT ... SELECT.
+
+    Runs inside the caller's transaction and does not commit.
+    """
+    a = aliased(OrderItem)
+    b = aliased(OrderItem)
+    pairs = (
+        select(a.course_id, b.course_id, 1)
+        .join(b, (b.order_id == a.order_id) & (b.course_id != a.course_id))
+        .where(a.order_id == order_id)
+    )
+    statement = sqlite_insert(CoursePair).from_select(["course_id", "related_course_id", "count"], pairs)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=["course_id", "related_course_id"],
+        set_={"count": CoursePair.count + statement.excluded.count},
+    ))
+
+async def get_related_courses(
+    db: AsyncSession, course_id: int, user_id: Optional[int] = None, limit: int = 10
+) -> List[Course]:
+    """Top `limit` courses bought together with `course_id`, most frequent first.
+
+    Reads ix_course_copurchases_top backwards from the course's entry, so the
+    cost is proportional to `limit` (plus skipped rows), not to order volume.
+    Courses in the user's cart or past orders are skipped.
+    """
+    query = (
+        select(Course)
+        .join(CoursePair, CoursePair.related_course_id == Course.id)
+        .where(CoursePair.course_id == course_id, Course.is_active == True)
+        .order_by(CoursePair.count.desc(), CoursePair.related_course_id.desc())
+        .limit(limit)
+    )
+    if user_id is not None:
+        owned = union(
+            select(CartItem.course_id).where(CartItem.user_id == user_id),
+            select(OrderItem.course_id)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(Order.user_id == user_id),
+        )
+        query = query.where(CoursePair.related_course_id.not_in(owned))
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def rebuild_copurchases(db: AsyncSession, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Recompute course_copurchases from scratch; returns the number of pairs.
+
+    order_items is streamed in order_id order through a read session and
+    grouped by order, so only one order's items and the pair counts are held
+    in memory. The table is replaced in a single write transaction.
+    """
+    counts: Counter = Counter()
+    query = (
+        select(OrderItem.order_id, OrderItem.course_id)
+        .order_by(OrderItem.order_id)
+        .execution_options(yield_per=batch_size)
+    )
+    async with AsyncReadSessionLocal() as session:
+        result = await session.stream(query)
+        current_order, courses = None, set()
+        async for order_id, course_id in result:
+            if order_id != current_order:
+                counts.update(permutations(courses, 2))
+                current_order, courses = order_id, set()
+            courses.add(course_id)
+        counts.update(permutations(courses, 2))
+
+    await db.execute(delete(CoursePair))
+    rows = [
+        {"course_id": course_id, "related_course_id": related_id, "count": count}
+        for (course_id, related_id), count in counts.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        await db.execute(insert(CoursePair), rows[start:start + batch_size])
+    await db.commit()
+    return len(rows)
@@ -0,0 +1,226 @@
+# backend/app/schema_v1.py - frozen schema of migration 1 (see migrations.py)
+#
+# The tables and indexes as they were when schema versioning was introduced.
+# Databases created by earlier releases (which ran create_all on every boot)
+# are brought up to exactly this schema; fresh databases start from it.
+# Never edit these statements: later schema changes are new migrations.
+
+V1_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER NOT NULL,
+        name VARCHAR NOT NULL,
+        description TEXT,
+        is_active BOOLEAN,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER NOT NULL,
+        kind VARCHAR NOT NULL,
+        payload TEXT NOT NULL,
+        status VARCHAR NOT NULL,
+        attempts INTEGER NOT NULL,
+        max_attempts INTEGER NOT NULL,
+        run_at FLOAT NOT NULL,
+        locked_until FLOAT,
+        enqueued_at FLOAT NOT NULL,
+        finished_at FLOAT,
+        last_error TEXT,
+        created_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sales_daily_rollups (
+        dimension VARCHAR NOT NULL,
+        "key" VARCHAR NOT NULL,
+        day VARCHAR NOT NULL,
+        orders INTEGER NOT NULL,
+        items INTEGER NOT NULL,
+        revenue FLOAT NOT NULL,
+        PRIMARY KEY (dimension, "key", day)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER NOT NULL,
+        name VARCHAR NOT NULL,
+        email VARCHAR NOT NULL,
+        hashed_password VARCHAR NOT NULL,
+        is_active BOOLEAN,
+        is_admin BOOLEAN DEFAULT 0,
+        cart_revision INTEGER DEFAULT 0,
+        orders_revision INTEGER DEFAULT 0,
+        created_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS courses (
+        id INTEGER NOT NULL,
+        title VARCHAR NOT NULL,
+        description TEXT,
+        price FLOAT NOT NULL,
+        instructor VARCHAR,
+        duration VARCHAR,
+        level VARCHAR,
+        image_url VARCHAR,
+        external_id VARCHAR,
+        category_id INTEGER,
+        is_active BOOLEAN,
+        created_at DATETIME,
+        rating_count INTEGER DEFAULT 0,
+        rating_sum INTEGER DEFAULT 0,
+        rating_avg FLOAT DEFAULT 0,
+        rating_1 INTEGER DEFAULT 0,
+        rating_2 INTEGER DEFAULT 0,
+        rating_3 INTEGER DEFAULT 0,
+        rating_4 INTEGER DEFAULT 0,
+        rating_5 INTEGER DEFAULT 0,
+        PRIMARY KEY (id),
+        FOREIGN KEY(category_id) REFERENCES categories (id) ON DELETE SET NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER NOT NULL,
+        user_id INTEGER,
+        total_amount FLOAT NOT NULL,
+        status VARCHAR,
+        created_at DATETIME,
+        idempotency_key VARCHAR,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cart_items (
+        id INTEGER NOT NULL,
+        user_id INTEGER,
+        course_id INTEGER,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE,
+        FOREIGN KEY(course_id) REFERENCES courses (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS course_copurchases (
+        course_id INTEGER NOT NULL,
+        related_course_id INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (course_id, related_course_id),
+        FOREIGN KEY(course_id) REFERENCES courses (id) ON DELETE CASCADE,
+        FOREIGN KEY(related_course_id) REFERENCES courses (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS order_items (
+        id INTEGER NOT NULL,
+        order_id INTEGER,
+        course_id INTEGER,
+        price FLOAT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(order_id) REFERENCES orders (id) ON DELETE CASCADE,
+        FOREIGN KEY(course_id) REFERENCES courses (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reviews (
+        id INTEGER NOT NULL,
+        course_id INTEGER,
+        user_id INTEGER,
+        rating INTEGER NOT NULL,
+        comment TEXT,
+        created_at DATETIME,
+        updated_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(course_id) REFERENCES courses (id) ON DELETE CASCADE,
+        FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    """,
+]
+
+# Columns that releases before versioning added to existing tables; an older
+# database may lack any of them. (table, column, column DDL)
+V1_ADDED_COLUMNS = [
+    ("users", "is_admin", "BOOLEAN DEFAULT 0"),
+    ("users", "cart_revision", "INTEGER DEFAULT 0"),
+    ("users", "orders_revision", "INTEGER DEFAULT 0"),
+    ("courses", "external_id", "VARCHAR"),
+    ("courses", "category_id", "INTEGER"),
+    ("courses", "rating_count", "INTEGER DEFAULT 0"),
+    ("courses", "rating_sum", "INTEGER DEFAULT 0"),
+    ("courses", "rating_avg", "FLOAT DEFAULT 0"),
+    ("courses", "rating_1", "INTEGER DEFAULT 0"),
+    ("courses", "rating_2", "INTEGER DEFAULT 0"),
+    ("courses", "rating_3", "INTEGER DEFAULT 0"),
+    ("courses", "rating_4", "INTEGER DEFAULT 0"),
+    ("courses", "rating_5", "INTEGER DEFAULT 0"),
+    ("orders", "idempotency_key", "VARCHAR"),
+    ("reviews", "updated_at", "DATETIME"),
+]
+
+V1_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_categories_id ON categories (id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_id ON jobs (id)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_status_run_at ON jobs (status, run_at)",
+    "CREATE INDEX IF NOT EXISTS ix_sales_daily_rollups_dimension_day ON sales_daily_rollups (dimension, day)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+    "CREATE INDEX IF NOT EXISTS ix_courses_active_created_at ON courses (is_active, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_courses_active_price ON courses (is_active, price, id)",
+    "CREATE INDEX IF NOT EXISTS ix_courses_active_rating ON courses (is_active, rating_avg, id)",
+    "CREATE INDEX IF NOT EXISTS ix_courses_active_title ON courses (is_active, title, id)",
+    "CREATE INDEX IF NOT EXISTS ix_courses_category_id ON courses (category_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_courses_external_id ON courses (external_id)",
+    "CREATE INDEX IF NOT EXISTS ix_courses_id ON courses (id)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_id ON orders (id)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_user_created_at ON orders (user_id, created_at, id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_orders_user_idempotency_key ON orders (user_id, idempotency_key)",
+    "CREATE INDEX IF NOT EXISTS ix_cart_items_id ON cart_items (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS unique_user_course_cart ON cart_items (user_id, course_id)",
+    "CREATE INDEX IF NOT EXISTS ix_course_copurchases_top ON course_copurchases (course_id, count, related_course_id)",
+    "CREATE INDEX IF NOT EXISTS ix_order_items_id ON order_items (id)",
+    "CREATE INDEX IF NOT EXISTS ix_order_items_order_id ON order_items (order_id)",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_course_created_at ON reviews (course_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_id ON reviews (id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS unique_user_course_review ON reviews (course_id, user_id)",
+]
+
+# External-content FTS5 table: the text lives in `courses`, the index in
+# `courses_fts`, and triggers keep the two in sync on every write.
+V1_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(
+        title, description, instructor,
+        content='courses', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_fts_ai AFTER INSERT ON courses BEGIN
+        INSERT INTO courses_fts(rowid, title, description, instructor)
+        VALUES (new.id, new.title, new.description, new.instructor);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_fts_ad AFTER DELETE ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, title, description, instructor)
+        VALUES ('delete', old.id, old.title, old.description, old.instructor);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS courses_fts_au AFTER UPDATE OF title, description, instructor ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, title, description, instructor)
+        VALUES ('delete', old.id, old.title, old.description, old.instructor);
+        INSERT INTO courses_fts(rowid, title, description, instructor)
+        VALUES (new.id, new.title, new.description, new.instructor);
+    END
+    """,
+]
@@ -1,7 +1,7 @@
 # backend/app/schemas.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # User schemas
 class UserCreate(BaseModel):
@@ -14,6 +14,7 @@ class UserRead(BaseModel):
     name: str
     email: EmailStr
     is_active: bool
+    is_admin: bool = False
     created_at: datetime
 
     class Config:
@@ -32,6 +33,8 @@ class CourseBase(BaseModel):
     duration: Optional[str] = None
     level: Optional[str] = None
     image_url: Optional[str] = None
+    category_id: Optional[int] = None
+    external_id: Optional[str] = None
 
 class CourseCreate(CourseBase):
     pass
@@ -40,14 +43,82 @@ class CourseRead(CourseBase):
     id: int
     is_active: bool
     created_at: datetime
+    rating_avg: float = 0.0
+    rating_count: int = 0
 
     class Config:
         from_attributes = True
 
+# Review schemas
+class ReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = None
+
+class ReviewUpdate(BaseModel):
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    comment: Optional[str] = None
+
+class ReviewRead(BaseModel):
+    id: int
+    course_id: int
+    user_id: int
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RatingSummary(BaseModel):
+    course_id: int
+    count: int
+    average: float
+    histogram: Dict[int, int]  # stars (1-5) -> number of reviews
+
+# Bulk import schemas
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class CourseImportReport(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+# Search schemas
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    label: Optional[str] = None
+    count: int
+
+class CourseSearchResult(BaseModel):
+    total: int
+    results: List[CourseRead]
+    facets: Dict[str, List[FacetCount]]
+
 # Cart schemas
 class CartItemCreate(BaseModel):
     course_id: int
 
+class CartBatchRequest(BaseModel):
+    course_ids: List[int] = Field(..., min_length=1, max_length=100)
+
+class CartBatchAddResult(BaseModel):
+    added: List[int]
+    skipped: List[int]  # already in cart
+    missing: List[int]  # no such active course
+
+class CartBatchRemoveResult(BaseModel):
+    removed: List[int]
+    missing: List[int]  # not in cart
+
+class CartSummary(BaseModel):
+    item_count: int
+    total: float
+    revision: int  # same marker as the /api/cart ETag; changes with every cart mutation
+
 class CartItemRead(BaseModel):
     id: int
     course: CourseRead
@@ -75,5 +146,60 @@ class OrderRead(BaseModel):
     class Config:
         from_attributes = True
 
+class OrderSummary(BaseModel):
+    id: int
+    total_amount: float
+    status: str
+    item_count: int
+    created_at: datetime
+
+class OrderHistoryPage(BaseModel):
+    items: List[OrderSummary]
+    next_cursor: Optional[str] = None
+
 class OrderCreate(BaseModel):
-    pass  # Order will be created from cart items
\ No newline at end of file
+    pass  # Order will be created from cart items
+
+# Analytics schemas
+class RevenueTotal(BaseModel):
+    key: str
+    label: Optional[str] = None
+    orders: int
+    items: int
+    revenue: float
+
+class DailyRevenue(BaseModel):
+    day: str
+    orders: int
+    items: int
+    revenue: float
+
+class RollupMismatch(BaseModel):
+    dimension: str
+    key: str
+    day: str
+    expected: Optional[DailyRevenue] = None  # from orders / order_items
+    actual: Optional[DailyRevenue] = None    # from the rollup table
+
+class RollupVerification(BaseModel):
+    checked: int
+    mismatches: List[RollupMismatch]
+
+# Bootstrap schema: only the requested sections are included in the response
+class BootstrapRead(BaseModel):
+    user: Optional[UserRead] = None
+    cart: Optional[List[CartItemRead]] = None
+    orders: Optional[List[OrderRead]] = None
+    order_history: Optional[OrderHistoryPage] = None  # first page of summaries
+    courses: Optional[List[CourseRead]] = None
+
+# Request profiles captured by the sampling profiler
+class ProfileRead(BaseModel):
+    name: str                # file name, used to download the collapsed stacks
+    method: str
+    route: str
+    status: int
+    duration_ms: int
+    samples: int
+    created_at: datetime
+    size_bytes: int
@@ -0,0 +1,119 @@
+# backend/app/search.py - SQLite FTS5 full-text search over the course catalog
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .schemas import CourseRead, CourseSearchResult, FacetCount
+
+# External-content FTS5 table over courses, kept in sync by triggers; created
+# by migration 1 (see schema_v1.py).
+
+# Column weights for bm25(): title matches count most, then instructor
+BM25_WEIGHTS = "10.0, 1.0, 4.0"
+
+COURSE_COLUMNS = (
+    "id", "title", "description", "price", "instructor", "duration",
+    "level", "image_url", "category_id", "external_id", "is_active", "created_at",
+    "rating_avg", "rating_count",
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression with prefix matching on every term."""
+    tokens = _TOKEN_RE.findall(query or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+async def search_courses(
+    db: AsyncSession,
+    q: Optional[str] = None,
+    level: Optional[str] = None,
+    category_id: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> CourseSearchResult:
+    """Ranked search with filters and facet counts, answered by a single statement.
+
+    The matched set is computed once in a CTE; the page of hits, the total and
+    the per-level / per-category facet counts are all read from it and returned
+    together via UNION ALL, discriminated by the `kind` column.
+    """
+    params: Dict[str, object] = {"limit": limit, "offset": offset}
+    filters = ["c.is_active = 1"]
+    if level is not None:
+        filters.append("c.level = :level")
+        params["level"] = level
+    if category_id is not None:
+        filters.append("c.category_id = :category_id")
+        params["category_id"] = category_id
+    if min_price is not None:
+        filters.append("c.price >= :min_price")
+        params["min_price"] = min_price
+    if max_price is not None:
+        filters.append("c.price <= :max_price")
+        params["max_price"] = max_price
+
+    match = build_match_query(q)
+    if match:
+        params["match"] = match
+        matched = (
+            f"SELECT c.id, c.level, c.category_id, bm25(courses_fts, {BM25_WEIGHTS}) AS rank "
+            "FROM courses_fts JOIN courses c ON c.id = courses_fts.rowid "
+            f"WHERE courses_fts MATCH :match AND {' AND '.join(filters)}"
+        )
+    else:
+        matched = (
+            "SELECT c.id, c.level, c.category_id, 0.0 AS rank "
+            f"FROM courses c WHERE {' AND '.join(filters)}"
+        )
+
+    course_columns = ", ".join(f"c.{name}" for name in COURSE_COLUMNS)
+    null_columns = ", ".join(f"NULL AS {name}" for name in COURSE_COLUMNS)
+    statement = text(f"""
+        WITH matched AS ({matched}),
+        page AS (
+            SELECT id, rank FROM matched ORDER BY rank, id LIMIT :limit OFFSET :offset
+        )
+        SELECT 'hit' AS kind, page.rank AS sort_key, NULL AS facet_value,
+               NULL AS facet_label, NULL AS facet_count, {course_columns}
+        FROM page JOIN courses c ON c.id = page.id
+        UNION ALL
+        SELECT 'total', NULL, NULL, NULL, COUNT(*), {null_columns} FROM matched
+        UNION ALL
+        SELECT 'level', NULL, level, level, COUNT(*), {null_columns}
+        FROM matched GROUP BY level
+        UNION ALL
+        SELECT 'category', NULL, matched.category_id, cat.name, COUNT(*), {null_columns}
+        FROM matched LEFT JOIN categories cat ON cat.id = matched.category_id
+        GROUP BY matched.category_id
+    """)
+
+    result = await db.execute(statement, params)
+    total = 0
+    hits = []
+    facets: Dict[str, List[FacetCount]] = {"level": [], "category": []}
+    for row in result.mappings():
+        kind = row["kind"]
+        if kind == "hit":
+            course = CourseRead.model_validate({name: row[name] for name in COURSE_COLUMNS})
+            hits.append((row["sort_key"], course.id, course))
+        elif kind == "total":
+            total = row["facet_count"]
+        else:
+            value = row["facet_value"]
+            facets[kind].append(FacetCount(
+                value=None if value is None else str(value),
+                label=row["facet_label"],
+                count=row["facet_count"],
+            ))
+    # UNION ALL does not guarantee branch order, so restore ranking here
+    hits.sort(key=lambda hit: (hit[0], hit[1]))
+    for counts in facets.values():
+        counts.sort(key=lambda facet: -facet.count)
+    return CourseSearchResult(total=total, results=[hit[2] for hit in hits], facets=facets)
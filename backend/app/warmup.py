@@ -0,0 +1,55 @@
+# backend/app/warmup.py - optional work done before a worker reports ready
+#
+# A freshly started worker pays for its first SQLite connections and an
+# empty catalog cache on the first requests it serves. With WARMUP_ENABLED
+# the startup hook does that work up front; /health answers 503 until
+# startup has finished, so a load balancer only routes to warm workers.
+import asyncio
+import logging
+import os
+import time
+
+from . import crud
+from .database_sqlite import AsyncReadSessionLocal, engine, read_engine, session_scope
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "false").lower() == "true"
+# Catalog page sizes to pre-load: the catalog default and the home page's featured list
+WARMUP_CATALOG_LIMITS = [
+    int(limit) for limit in os.getenv("WARMUP_CATALOG_LIMITS", "100,3").split(",") if limit.strip()
+]
+
+async def open_pool(pool_engine) -> int:
+    """Open the engine's pooled connections at once and return them to the pool."""
+    size = pool_engine.pool.size() if hasattr(pool_engine.pool, "size") else 1
+
+    async def connect():
+        connection = await pool_engine.connect()
+        await connection.exec_driver_sql("SELECT 1")
+        return connection
+
+    # All checked out together, so each one is a new connection rather than a reused one
+    results = await asyncio.gather(*(connect() for _ in range(size)), return_exceptions=True)
+    for result in results:
+        if not isinstance(result, BaseException):
+            await result.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return size
+
+async def warm_catalog() -> int:
+    async with session_scope(AsyncReadSessionLocal) as db:
+        for limit in WARMUP_CATALOG_LIMITS:
+            await crud.get_courses_cached(db, skip=0, limit=limit)
+    return len(WARMUP_CATALOG_LIMITS)
+
+async def warm_up() -> dict:
+    started = time.perf_counter()
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+    connections = sum(await asyncio.gather(*(open_pool(pool_engine) for pool_engine in engines)))
+    pages = await warm_catalog()
+    seconds = round(time.perf_counter() - started, 4)
+    logger.info(f"Warm-up opened {connections} connections and cached {pages} catalog pages in {seconds:.3f}s")
+    return {"connections": connections, "catalog_pages": pages, "seconds": seconds}
@@ -0,0 +1 @@
+# backend/benchmarks - offline performance benchmarks for the Course Store API
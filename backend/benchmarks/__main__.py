@@ -0,0 +1,4 @@
+# backend/benchmarks/__main__.py - `python -m benchmarks` runs the API benchmark
+from .api import main
+
+main()
@@ -0,0 +1,219 @@
+# backend/benchmarks/api.py
+"""End-to-end API benchmark.
+
+Seeds a fresh database, then drives the real ``app.main.app`` in-process
+through an ASGI client at fixed concurrency levels across every route and
+prints throughput, latency percentiles and SQL statements per request as
+JSON, so runs can be diffed between commits.
+
+    cd backend
+    python -m benchmarks --concurrency 1 8 32 --requests 200 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Awaitable, Callable, List, Optional
+
+from .common import StatementCounter, summarize_latencies, use_temporary_database
+from .seed import BENCH_PASSWORD, add_seed_arguments, bench_email, seed_kwargs
+
+@dataclass
+class Scenario:
+    name: str
+    request: Callable[..., Awaitable]
+    setup: Optional[Callable[..., Awaitable]] = None
+    requests: Optional[int] = None  # override the default request count
+
+def _course_for(ctx, user, iteration: int) -> int:
+    return (user.id * 7919 + iteration * 104729) % ctx.courses + 1
+
+def build_scenarios(ctx) -> List[Scenario]:
+    async def courses_list(client, user, i):
+        return await client.get("/api/courses", params={"limit": 50})
+
+    async def courses_page(client, user, i):
+        return await client.get("/api/courses", params={"limit": 50, "sort": "price"})
+
+    async def course_detail(client, user, i):
+        return await client.get(f"/api/courses/{_course_for(ctx, user, i)}")
+
+    async def course_search(client, user, i):
+        return await client.get("/api/courses/search", params={"q": "pyth", "limit": 20})
+
+    async def login(client, user, i):
+        return await client.post("/api/login", json={"email": user.email, "password": BENCH_PASSWORD})
+
+    async def me(client, user, i):
+        return await client.get("/api/me", headers=user.headers)
+
+    async def cart_get(client, user, i):
+        return await client.get("/api/cart", headers=user.headers)
+
+    async def cart_add(client, user, i):
+        return await client.post("/api/cart", json={"course_id": _course_for(ctx, user, i)}, headers=user.headers)
+
+    async def cart_remove(client, user, i):
+        return await client.request(
+            "DELETE", "/api/cart/batch", json={"course_ids": [_course_for(ctx, user, i)]}, headers=user.headers
+        )
+
+    async def fill_cart(client, user, i):
+        ids = [_course_for(ctx, user, i * 3 + k) for k in range(3)]
+        await client.post("/api/cart/batch", json={"course_ids": ids}, headers=user.headers)
+
+    async def checkout(client, user, i):
+        return await client.post("/api/orders", headers=user.headers)
+
+    async def orders_history(client, user, i):
+        return await client.get("/api/orders", headers=user.headers)
+
+    return [
+        Scenario("courses_list", courses_list),
+        Scenario("courses_page", courses_page),
+        Scenario("course_detail", course_detail),
+        Scenario("course_search", course_search),
+        Scenario("login", login, requests=ctx.login_requests),
+        Scenario("me", me),
+        Scenario("cart_get", cart_get),
+        Scenario("cart_add", cart_add),
+        Scenario("cart_remove", cart_remove),
+        Scenario("checkout", checkout, setup=fill_cart),
+        Scenario("orders_history", orders_history),
+    ]
+
+async def _measure_statements(client, counter, scenario, users, samples: int) -> dict:
+    """Run a scenario sequentially and count SQL statements per request exactly."""
+    counts = []
+    for i in range(samples):
+        user = users[i % len(users)]
+        if scenario.setup:
+            await scenario.setup(client, user, 10_000 + i)
+        before = counter.count
+        await scenario.request(client, user, 10_000 + i)
+        counts.append(counter.count - before)
+    return {
+        "sql_statements_per_request": round(sum(counts) / len(counts), 2) if counts else None,
+        "sql_statements_max": max(counts, default=None),
+    }
+
+async def _run_level(client, scenario, users, concurrency: int, total: int) -> dict:
+    latencies = []
+    statuses = Counter()
+    next_index = 0
+
+    async def worker(worker_id: int):
+        nonlocal next_index
+        user = users[worker_id % len(users)]
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            if scenario.setup:
+                await scenario.setup(client, user, i)
+            started = time.perf_counter()
+            response = await scenario.request(client, user, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(response.status_code)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    result = {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "status_counts": dict(statuses),
+    }
+    result.update(summarize_latencies(latencies))
+    return result
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_benchmark(args) -> dict:
+    use_temporary_database(args.dir)
+
+    import httpx
+    from app import auth
+    from app.database_sqlite import engine, read_engine, close_database_connections
+    from app.main import app
+
+    dataset = await seed_database_from_args(args)
+    counter = StatementCounter(engine, read_engine)
+
+    max_users = max(args.concurrency)
+    users = []
+    for index in range(1, min(max_users, args.users) + 1):
+        user = SimpleNamespace(id=index, email=bench_email(index))
+        token = auth.create_access_token({"sub": auth.token_subject(user)})
+        user.headers = {"Authorization": f"Bearer {token}"}
+        users.append(user)
+
+    ctx = SimpleNamespace(courses=args.courses, login_requests=args.login_requests)
+    scenarios = [s for s in build_scenarios(ctx) if not args.scenarios or s.name in args.scenarios]
+
+    report = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in scenarios:
+            entry = await _measure_statements(client, counter, scenario, users, args.statement_samples)
+            entry["levels"] = {}
+            for concurrency in args.concurrency:
+                total = scenario.requests or args.requests
+                entry["levels"][str(concurrency)] = await _run_level(client, scenario, users, concurrency, total)
+            report[scenario.name] = entry
+
+    auth.hash_pool.shutdown()
+    await close_database_connections()
+    return {
+        "meta": {
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "concurrency": args.concurrency,
+            "requests_per_level": args.requests,
+            "bcrypt_rounds": auth.BCRYPT_ROUNDS,
+            "dataset": dataset,
+        },
+        "scenarios": report,
+    }
+
+async def seed_database_from_args(args) -> dict:
+    from .seed import seed_database
+    return await seed_database(**seed_kwargs(args))
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Course Store API benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario per level")
+    parser.add_argument("--login-requests", type=int, default=40, help="requests per level for /api/login")
+    parser.add_argument("--statement-samples", type=int, default=5)
+    parser.add_argument("--scenarios", nargs="*", help="only run these scenarios")
+    parser.add_argument("--dir", default=None, help="directory for the benchmark database")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    add_seed_arguments(parser)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
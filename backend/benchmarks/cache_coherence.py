@@ -0,0 +1,141 @@
+# backend/benchmarks/cache_coherence.py
+"""How long a write takes to evict cached data in other worker processes.
+
+Starts several uvicorn workers on one temporary database, warms their
+catalog and principal caches, then writes through ``app.crud`` from this
+process and times how long each worker keeps serving the old data. Runs
+with polling only and with the Unix-socket fast path.
+
+    cd backend
+    python -m benchmarks.cache_coherence --workers 3 --rounds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from .common import summarize_latencies, use_temporary_database
+
+PASSWORD = "bench-password"
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def _start_workers(count: int, socket_dir: str, poll_interval: float):
+    import httpx
+
+    env = dict(os.environ, JOBS_ENABLED="false", INVALIDATION_SOCKET_DIR=socket_dir,
+               INVALIDATION_POLL_INTERVAL=str(poll_interval))
+    ports = [_free_port() for _ in range(count)]
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        for port in ports
+    ]
+    urls = [f"http://127.0.0.1:{port}" for port in ports]
+    async with httpx.AsyncClient() as client:
+        for url in urls:
+            for _ in range(200):
+                try:
+                    if (await client.get(f"{url}/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError(f"Worker at {url} did not become ready")
+    return processes, urls
+
+async def _time_until(client, urls, request, is_fresh, timeout: float = 10.0) -> list:
+    """Milliseconds until each worker serves fresh data (None if it never did)."""
+    async def one(url):
+        started = time.perf_counter()
+        while time.perf_counter() - started < timeout:
+            if is_fresh(await request(client, url)):
+                return (time.perf_counter() - started) * 1000
+            await asyncio.sleep(0.002)
+        return None
+    return await asyncio.gather(*(one(url) for url in urls))
+
+async def _run_mode(args, mode: str) -> dict:
+    import httpx
+    from app import crud, invalidation, schemas
+    from app.database_sqlite import AsyncSessionLocal
+
+    socket_dir = tempfile.mkdtemp(prefix="course-bus-") if mode == "socket" else ""
+    invalidation.bus.socket_dir = socket_dir
+    processes, urls = await _start_workers(args.workers, socket_dir, args.poll_interval)
+    catalog_ms, principal_ms, stale = [], [], 0
+    try:
+        async with httpx.AsyncClient() as client:
+            for round_no in range(args.rounds):
+                # Catalog: every worker caches the page, then a course is added here
+                for url in urls:
+                    await client.get(f"{url}/api/courses", params={"limit": 1000})
+                async with AsyncSessionLocal() as db:
+                    course = await crud.create_course(db, schemas.CourseCreate(
+                        title=f"{mode} course {round_no}", price=1.0, level="beginner"))
+
+                async def catalog(client, url):
+                    return await client.get(f"{url}/api/courses", params={"limit": 1000})
+                timings = await _time_until(
+                    client, urls, catalog, lambda r: any(c["id"] == course.id for c in r.json()))
+
+                # Principal: every worker caches the user, then it is deactivated here
+                email = f"{mode}-{round_no}@example.com"
+                async with AsyncSessionLocal() as db:
+                    user = await crud.create_user(db, schemas.UserCreate(name="Bench", email=email, password=PASSWORD))
+                token = (await client.post(f"{urls[0]}/api/login",
+                                           json={"email": email, "password": PASSWORD})).json()["access_token"]
+                headers = {"Authorization": f"Bearer {token}"}
+                for url in urls:
+                    await client.get(f"{url}/api/me", headers=headers)
+                async with AsyncSessionLocal() as db:
+                    await crud.set_user_active(db, user.id, False)
+
+                async def me(client, url):
+                    return await client.get(f"{url}/api/me", headers=headers)
+                timings_principal = await _time_until(client, urls, me, lambda r: r.status_code == 403)
+
+                for values, target in ((timings, catalog_ms), (timings_principal, principal_ms)):
+                    stale += sum(value is None for value in values)
+                    target.extend(value for value in values if value is not None)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    return {
+        "mode": mode,
+        "workers": args.workers,
+        "poll_interval_s": args.poll_interval,
+        "catalog_stale_ms": summarize_latencies(catalog_ms),
+        "principal_stale_ms": summarize_latencies(principal_ms),
+        "never_refreshed": stale,
+    }
+
+async def main(args):
+    use_temporary_database()
+    from app.database_sqlite import create_all_tables
+
+    await create_all_tables()
+    results = [await _run_mode(args, mode) for mode in args.modes]
+    print(json.dumps({"results": results}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--modes", nargs="+", default=["poll", "socket"], choices=["poll", "socket"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,45 @@
+# backend/benchmarks/common.py - helpers shared by the benchmark scripts
+import os
+import statistics
+import tempfile
+from typing import List, Optional
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize_latencies(samples_ms: List[float]) -> dict:
+    """p50/p95/p99/mean/max of a list of latencies in milliseconds."""
+    if not samples_ms:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    return {
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "mean_ms": round(statistics.mean(samples_ms), 3),
+        "max_ms": round(max(samples_ms), 3),
+    }
+
+def use_temporary_database(directory: Optional[str] = None) -> str:
+    """Point the app at a fresh SQLite file. Must run before importing `app`."""
+    path = os.path.join(tempfile.mkdtemp(prefix="course-bench-", dir=directory), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    # Every benchmark client shares one address and a few emails; don't rate-limit them
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    return path
+
+class StatementCounter:
+    """Counts SQL statements issued through the app's engines."""
+
+    def __init__(self, *engines):
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in dict.fromkeys(engine.sync_engine for engine in engines):
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
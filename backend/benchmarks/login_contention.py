@@ -0,0 +1,80 @@
+# backend/benchmarks/login_contention.py
+"""Catalog latency while logins are hammering bcrypt.
+
+Runs the real app in-process and compares hashing inline on the event loop
+(the old behaviour) against the bounded hash pool.
+
+    cd backend
+    python -m benchmarks.login_contention --logins 8 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from .common import percentile, use_temporary_database
+
+async def _run_mode(app, auth, mode, args):
+    import httpx
+
+    auth.configure_hash_pool(kind=mode, workers=args.workers, queue_size=args.queue)
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    logins = {"ok": 0, "busy": 0}
+    deadline = time.perf_counter() + args.duration
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login_loop():
+            while time.perf_counter() < deadline:
+                r = await client.post("/api/login", json={"email": "bench@example.com", "password": "bench-password"})
+                logins["ok" if r.status_code == 200 else "busy"] += 1
+
+        async def catalog_loop():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/api/courses")
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(
+            *(login_loop() for _ in range(args.logins)),
+            *(catalog_loop() for _ in range(args.readers)),
+        )
+
+    return {
+        "mode": mode,
+        "catalog_requests": len(latencies),
+        "catalog_p50_ms": round(percentile(latencies, 50), 2),
+        "catalog_p99_ms": round(percentile(latencies, 99), 2),
+        "catalog_mean_ms": round(statistics.mean(latencies), 2),
+        "logins_ok": logins["ok"],
+        "logins_rejected": logins["busy"],
+    }
+
+async def main(args):
+    use_temporary_database()
+
+    from app.main import app
+    from app import auth, crud, schemas
+    from app.database_sqlite import AsyncSessionLocal, create_all_tables
+
+    await create_all_tables()
+    async with AsyncSessionLocal() as db:
+        await crud.create_user(db, schemas.UserCreate(name="Bench", email="bench@example.com", password="bench-password"))
+        for i in range(50):
+            await crud.create_course(db, schemas.CourseCreate(title=f"Course {i}", price=10 + i))
+
+    results = [await _run_mode(app, auth, mode, args) for mode in ("inline", args.pool)]
+    auth.hash_pool.shutdown()
+    print(json.dumps({"bcrypt_rounds": auth.BCRYPT_ROUNDS, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login clients")
+    parser.add_argument("--readers", type=int, default=2, help="concurrent catalog clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=32)
+    asyncio.run(main(parser.parse_args()))
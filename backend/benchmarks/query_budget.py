@@ -0,0 +1,362 @@
+# backend/benchmarks/query_budget.py
+"""SQL query budgets for every API route.
+
+Seeds users whose carts, order histories and course reviews grow through
+``--sizes``, calls every route of ``app.main.app`` once per size with cold
+caches, and records the SQL issued through the app's engines. A route fails
+when its statement count changes with the data size (an N+1), exceeds its
+budget, or when ``EXPLAIN QUERY PLAN`` shows a full table scan. Failures are
+printed with a diff of the offending statements and the exit code is 1.
+Every route must have a probe here: new endpoints fail until they get one.
+tests/test_query_budget.py runs the same probes under pytest.
+
+    cd backend
+    python -m benchmarks.query_budget --sizes 1 10 50
+"""
+import argparse
+import asyncio
+import difflib
+import json
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Tuple
+
+from .common import use_temporary_database
+
+PASSWORD = "bench-password"
+COURSES = 200
+SIZES = (1, 10, 50)
+
+@dataclass
+class Probe:
+    method: str
+    path: str
+    call: Callable[..., Awaitable]  # (client, fixture) -> response
+    budget: int  # most statements one request may issue
+    # Tables (as named in the plan, i.e. aliases) a deliberate full scan may read
+    allow_scans: FrozenSet[str] = frozenset()
+
+@dataclass
+class Fixture:
+    """Per-size data: a user with `size` cart items and orders, a course with `size` reviews."""
+    size: int
+    email: str
+    headers: Dict[str, str]
+    admin_headers: Dict[str, str]
+    course_id: int
+    spare_course_ids: List[int]
+    extra_cart_item_id: int  # the cart item beyond `size`, removed by DELETE /api/cart/{id}
+    order_id: int
+    state: Dict[str, int] = field(default_factory=dict)  # ids created by earlier probes
+
+class StatementRecorder:
+    """Records (statement, parameters) issued through the app's engines while active."""
+
+    def __init__(self, *engines):
+        from sqlalchemy import event
+
+        self.active = False
+        self.statements: List[Tuple[str, object]] = []
+        for engine in dict.fromkeys(engine.sync_engine for engine in engines):
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            params = parameters[0] if executemany and parameters else parameters
+            self.statements.append((statement, params))
+
+def normalize(statement: str) -> str:
+    statement = " ".join(statement.split())
+    # Expanded IN lists differ only in their number of placeholders
+    return re.sub(r"\(\?(?:, \?)+\)", "(?, ...)", statement)
+
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT INTO \S+ (\([^)]*\) )?SELECT)", re.I)
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+CTE_NAME = re.compile(r"(\w+) AS \(\s*SELECT", re.I)
+
+def build_probes() -> List[Probe]:
+    def get(path, **params):
+        async def call(client, fx):
+            return await client.get(path.format(fx=fx), params=params, headers=fx.headers)
+        return call
+
+    def admin_get(path, **params):
+        async def call(client, fx):
+            return await client.get(path.format(fx=fx), params=params, headers=fx.admin_headers)
+        return call
+
+    async def register(client, fx):
+        return await client.post("/api/register", json={
+            "name": "Probe", "email": f"new{fx.size}@example.com", "password": PASSWORD})
+
+    async def login(client, fx):
+        return await client.post("/api/login", json={"email": fx.email, "password": PASSWORD})
+
+    async def create_review(client, fx):
+        response = await client.post(f"/api/courses/{fx.course_id}/reviews",
+                                     json={"rating": 4, "comment": "Probe"}, headers=fx.headers)
+        fx.state["review_id"] = response.json()["id"]
+        return response
+
+    async def update_review(client, fx):
+        return await client.put(f"/api/reviews/{fx.state['review_id']}", json={"rating": 5}, headers=fx.headers)
+
+    async def delete_review(client, fx):
+        return await client.delete(f"/api/reviews/{fx.state['review_id']}", headers=fx.headers)
+
+    async def import_courses(client, fx):
+        body = "".join(json.dumps({"title": f"Imported {fx.size}-{i}", "price": 10, "external_id": f"imp-{fx.size}-{i}"})
+                       + "\n" for i in range(3))
+        return await client.post("/api/admin/courses/import", content=body, headers=fx.admin_headers)
+
+    async def get_profile(client, fx):
+        from app.profiling import RequestProfile, profiler
+
+        # A profile file to read back; the sampler itself stays off
+        name = profiler.save(RequestProfile(asyncio.current_task(), 0), "GET", "/api/courses", 200)
+        return await client.get(f"/api/admin/profiles/{name}", headers=fx.admin_headers)
+
+    # Adds and removals cancel out, so checkout still sees `size` cart items
+    async def cart_add(client, fx):
+        return await client.post("/api/cart", json={"course_id": fx.spare_course_ids[0]}, headers=fx.headers)
+
+    async def cart_remove(client, fx):
+        return await client.delete(f"/api/cart/{fx.extra_cart_item_id}", headers=fx.headers)
+
+    async def cart_batch_add(client, fx):
+        return await client.post("/api/cart/batch", json={"course_ids": fx.spare_course_ids}, headers=fx.headers)
+
+    async def cart_batch_remove(client, fx):
+        return await client.request("DELETE", "/api/cart/batch", json={"course_ids": fx.spare_course_ids},
+                                    headers=fx.headers)
+
+    async def checkout(client, fx):
+        return await client.post("/api/orders", headers=fx.headers)
+
+    # Read routes first; writes run in an order that keeps the next probe's data in place
+    return [
+        Probe("GET", "/", get("/"), 0),
+        Probe("GET", "/health", get("/health"), 1),
+        Probe("GET", "/metrics", get("/metrics"), 0),
+        Probe("GET", "/api/me", get("/api/me"), 1),
+        Probe("GET", "/api/bootstrap", get("/api/bootstrap", fields="user,cart,orders,order_history,courses"), 8),
+        Probe("GET", "/api/courses", get("/api/courses"), 2),
+        Probe("GET", "/api/courses/search", get("/api/courses/search", q="probe"), 1),
+        Probe("GET", "/api/courses/top-rated", get("/api/courses/top-rated"), 2),
+        Probe("GET", "/api/courses/{course_id}", get("/api/courses/{fx.course_id}"), 2),
+        Probe("GET", "/api/courses/{course_id}/related", get("/api/courses/{fx.course_id}/related"), 2),
+        Probe("GET", "/api/courses/{course_id}/reviews", get("/api/courses/{fx.course_id}/reviews"), 1),
+        Probe("GET", "/api/courses/{course_id}/rating", get("/api/courses/{fx.course_id}/rating"), 1),
+        Probe("GET", "/api/cart", get("/api/cart"), 5),
+        Probe("GET", "/api/cart/summary", get("/api/cart/summary"), 2),
+        Probe("GET", "/api/orders", get("/api/orders"), 6),
+        Probe("GET", "/api/orders/history", get("/api/orders/history"), 3),
+        Probe("GET", "/api/orders/{order_id}", get("/api/orders/{fx.order_id}"), 4),
+        Probe("GET", "/api/admin/courses/export", admin_get("/api/admin/courses/export"), 2,
+              allow_scans=frozenset({"courses"})),
+        Probe("GET", "/api/admin/analytics/revenue", admin_get("/api/admin/analytics/revenue"), 3),
+        Probe("GET", "/api/admin/analytics/daily", admin_get("/api/admin/analytics/daily"), 2),
+        # Compares every rollup row with a fresh aggregation of order_items on purpose
+        Probe("GET", "/api/admin/analytics/verify", admin_get("/api/admin/analytics/verify"), 3,
+              allow_scans=frozenset({"oi", "sales_daily_rollups"})),
+        Probe("GET", "/api/admin/profiles", admin_get("/api/admin/profiles"), 1),
+        Probe("GET", "/api/admin/profiles/{name}", get_profile, 1),
+        Probe("POST", "/api/register", register, 4),
+        Probe("POST", "/api/login", login, 1),
+        Probe("POST", "/api/courses/{course_id}/reviews", create_review, 7),
+        Probe("PUT", "/api/reviews/{review_id}", update_review, 7),
+        Probe("DELETE", "/api/reviews/{review_id}", delete_review, 6),
+        Probe("POST", "/api/admin/courses/import", import_courses, 5),
+        Probe("POST", "/api/cart", cart_add, 3),
+        Probe("DELETE", "/api/cart/{cart_item_id}", cart_remove, 4),
+        Probe("POST", "/api/cart/batch", cart_batch_add, 4),
+        Probe("DELETE", "/api/cart/batch", cart_batch_remove, 3),
+        Probe("POST", "/api/orders", checkout, 10),
+    ]
+
+async def seed(sizes) -> List[Fixture]:
+    """Catalog of COURSES courses plus, per size n, a user with n cart items (and one
+    more for the removal probe) and n orders (the last one with n items), and a course
+    with n reviews and n co-purchases."""
+    from app import analytics, auth, crud, recommendations
+    from app.database_sqlite import AsyncSessionLocal, create_all_tables
+    from app.models import CartItem, Course, Order, OrderItem, Review, User
+
+    await create_all_tables()
+    hashed = auth.get_password_hash(PASSWORD)
+
+    def headers_for(user) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {auth.create_access_token({'sub': auth.token_subject(user)})}"}
+
+    async with AsyncSessionLocal() as db:
+        db.add_all(Course(title=f"Probe course {i}", description=f"Probe course number {i}", price=float(i % 50 + 1),
+                          instructor=f"Instructor {i % 10}", level=("beginner", "intermediate", "advanced")[i % 3])
+                   for i in range(1, COURSES + 1))
+        admin = User(name="Admin", email="admin@example.com", hashed_password=hashed, is_admin=True)
+        reviewers = [User(name=f"Reviewer {i}", email=f"reviewer{i}@example.com", hashed_password=hashed)
+                     for i in range(max(sizes))]
+        db.add(admin)
+        db.add_all(reviewers)
+        await db.flush()
+
+        fixtures = []
+        for index, size in enumerate(sizes):
+            course_id = COURSES - index
+            spare = [COURSES - 20 - index * 5 - k for k in range(3)]
+            user = User(name=f"Probe {size}", email=f"probe{size}@example.com", hashed_password=hashed)
+            db.add(user)
+            await db.flush()
+            cart = [CartItem(user_id=user.id, course_id=c) for c in range(1, size + 2)]
+            db.add_all(cart)
+            orders = [Order(user_id=user.id, total_amount=1.0, status="completed") for _ in range(size)]
+            db.add_all(orders)
+            await db.flush()
+            for order in orders[:-1]:
+                db.add(OrderItem(order_id=order.id, course_id=course_id, price=1.0))
+            # The newest order holds `size` items, all bought together with course_id
+            db.add_all(OrderItem(order_id=orders[-1].id, course_id=c, price=1.0)
+                       for c in [course_id, *range(COURSES // 2, COURSES // 2 + size - 1)])
+            db.add_all(Review(course_id=course_id, user_id=reviewer.id, rating=1 + i % 5, comment="Seeded")
+                       for i, reviewer in enumerate(reviewers[:size]))
+            await db.flush()
+            fixtures.append(Fixture(
+                size=size, email=user.email, headers=headers_for(user), admin_headers=headers_for(admin),
+                course_id=course_id, spare_course_ids=spare, extra_cart_item_id=cart[-1].id,
+                order_id=orders[-1].id,
+            ))
+        await db.commit()
+
+        await crud.rebuild_rating_aggregates(db)
+        await recommendations.rebuild_copurchases(db)
+        await analytics.rebuild_rollups(db)
+    return fixtures
+
+async def explain_scans(engine, statements, allowed: FrozenSet[str]) -> List[Tuple[str, List[str]]]:
+    """(statement, plan) for every distinct statement whose plan scans a whole table."""
+    offending = []
+    seen = set()
+    async with engine.connect() as conn:
+        for statement, params in statements:
+            key = normalize(statement)
+            if key in seen or not EXPLAINABLE.match(statement):
+                continue
+            seen.add(key)
+            # Materialized CTEs show up as scans too; only tables count
+            allowed_here = allowed | set(CTE_NAME.findall(statement))
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params or ())
+            plan = [row[3] for row in result.all()]
+            scans = [detail for detail in plan if (m := FULL_SCAN.match(detail)) and m.group(1) not in allowed_here]
+            if scans:
+                offending.append((key, plan))
+    return offending
+
+def statement_diff(small: List[str], large: List[str], small_size: int, large_size: int) -> str:
+    lines = list(difflib.unified_diff(small, large, f"size {small_size}", f"size {large_size}", lineterm="", n=1))
+    repeated = [(sql, n) for sql, n in Counter(large).items() if n > 1]
+    if repeated:
+        lines.append("repeated at the larger size:")
+        lines.extend(f"  {n}x {sql}" for sql, n in sorted(repeated, key=lambda item: -item[1]))
+    return "\n".join(lines)
+
+Report = List[Tuple[str, Dict[int, int], int]]  # (route, statements per size, budget)
+
+async def measure(sizes, routes=None) -> Tuple[Report, Dict[str, List[str]]]:
+    """Seed the app's (empty) database and probe every route once per size.
+
+    Returns the statement counts and the failures keyed by "METHOD path". The
+    caller points DATABASE_URL at a scratch database before importing `app`
+    and disposes the engines afterwards; tests/test_query_budget.py asserts on
+    the same failures.
+    """
+    import httpx
+    from fastapi.routing import APIRoute
+    from app.cache import catalog_cache, principal_cache, token_cache
+    from app.database_sqlite import engine, read_engine
+    from app.main import app, boot
+
+    boot["ready"] = True  # /health answers 503 until startup ran, which the ASGI client skips
+    fixtures = await seed(sizes)
+    recorder = StatementRecorder(engine, read_engine)
+    probes = [p for p in build_probes() if not routes or p.path in routes]
+    failures: Dict[str, List[str]] = {}
+
+    routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    for method, path in sorted(routes - {(p.method, p.path) for p in build_probes()}):
+        failures.setdefault(f"{method} {path}", []).append("no probe or budget defined in benchmarks/query_budget.py")
+
+    # statements[probe index][size] -> normalized statements
+    statements: Dict[int, Dict[int, List[str]]] = {i: {} for i in range(len(probes))}
+    raw: Dict[int, List[Tuple[str, object]]] = {i: [] for i in range(len(probes))}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://budget") as client:
+        for fixture in fixtures:
+            for i, probe in enumerate(probes):
+                # Cold caches, so every request shows the queries it can issue
+                catalog_cache.bump_version()
+                principal_cache.clear()
+                token_cache.clear()
+                recorder.statements = []
+                recorder.active = True
+                try:
+                    response = await probe.call(client, fixture)
+                finally:
+                    recorder.active = False
+                if response.status_code >= 400:
+                    failures.setdefault(f"{probe.method} {probe.path}", []).append(
+                        f"size {fixture.size}: HTTP {response.status_code} {response.text[:200]}")
+                statements[i][fixture.size] = [normalize(sql) for sql, _ in recorder.statements]
+                raw[i].extend(recorder.statements)
+
+    report: Report = []
+    for i, probe in enumerate(probes):
+        counts = {size: len(sqls) for size, sqls in statements[i].items()}
+        name = f"{probe.method} {probe.path}"
+        report.append((name, counts, probe.budget))
+        errors = failures.setdefault(name, [])
+        small, large = min(counts), max(counts)
+        if len(set(counts.values())) > 1:
+            errors.append(f"statement count grows with data size {counts}\n"
+                          + statement_diff(statements[i][small], statements[i][large], small, large))
+        if max(counts.values()) > probe.budget:
+            worst = max(counts, key=counts.get)
+            errors.append(f"{counts[worst]} statements, budget {probe.budget}\n"
+                          + "\n".join(f"  {sql}" for sql in statements[i][worst]))
+        for sql, plan in await explain_scans(engine, raw[i], probe.allow_scans):
+            errors.append(f"full table scan\n  {sql}\n" + "\n".join(f"    {step}" for step in plan))
+    return report, {name: errors for name, errors in failures.items() if errors}
+
+async def run(args) -> int:
+    database = use_temporary_database(args.dir)
+    os.environ["PROFILE_DIR"] = os.path.join(os.path.dirname(database), "profiles")
+
+    from app import auth
+    from app.database_sqlite import close_database_connections
+
+    try:
+        report, failures = await measure(args.sizes, args.routes)
+    finally:
+        auth.hash_pool.shutdown()
+        await close_database_connections()
+
+    width = max(len(name) for name, _, _ in report)
+    print(f"{'route':<{width}}  {'budget':>6}  " + "  ".join(f"n={size:<4}" for size in args.sizes))
+    for name, counts, budget in report:
+        print(f"{name:<{width}}  {budget:>6}  " + "  ".join(f"{counts.get(size, '-'):<6}" for size in args.sizes))
+    if failures:
+        messages = [f"{name}: {error}" for name, errors in failures.items() for error in errors]
+        print(f"\n{len(messages)} query budget failure(s):\n", file=sys.stderr)
+        print("\n\n".join(messages), file=sys.stderr)
+        return 1
+    print("\nAll routes within their query budgets.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES),
+                        help="cart items / orders / reviews per probe user")
+    parser.add_argument("--routes", nargs="*", help="only probe these route paths")
+    parser.add_argument("--dir", default=None, help="directory for the temporary database")
+    sys.exit(asyncio.run(run(parser.parse_args())))
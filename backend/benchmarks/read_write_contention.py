@@ -0,0 +1,115 @@
+# backend/benchmarks/read_write_contention.py
+"""Read latency while writers are committing, per SQLite storage profile.
+
+Each profile runs in its own subprocess (engines are configured at import
+time) against a fresh database. Writers repeatedly rewrite a slice of the
+catalog in one transaction; readers time catalog queries on the read engine.
+
+    cd backend
+    python -m benchmarks.read_write_contention --duration 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .common import percentile
+
+async def _worker(args):
+    from sqlalchemy import text
+    import app.models  # noqa: F401  (register tables)
+    from app import database_sqlite as db
+
+    await db.create_all_tables()
+    async with db.engine.begin() as conn:
+        await conn.execute(text(
+            "WITH RECURSIVE seq(value) AS (SELECT 1 UNION ALL SELECT value + 1 FROM seq WHERE value < :n) "
+            "INSERT INTO courses (title, description, price, level, is_active, created_at) "
+            "SELECT 'Course ' || value, 'Description ' || value, value % 100, 'beginner', 1, CURRENT_TIMESTAMP FROM seq"
+        ), {"n": args.courses})
+
+    deadline = time.perf_counter() + args.duration
+    read_latencies = []
+    read_errors = 0
+    writes = 0
+    write_errors = 0
+
+    async def writer():
+        nonlocal writes, write_errors
+        while time.perf_counter() < deadline:
+            try:
+                async with db.engine.begin() as conn:
+                    start = (writes * args.batch) % args.courses
+                    await conn.execute(
+                        text("UPDATE courses SET description = description || '.' WHERE id > :start AND id <= :end"),
+                        {"start": start, "end": start + args.batch},
+                    )
+                writes += 1
+            except Exception:
+                write_errors += 1
+
+    async def reader():
+        nonlocal read_errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with db.AsyncReadSessionLocal() as session:
+                    await session.execute(text(
+                        "SELECT id, title, price FROM courses WHERE is_active = 1 ORDER BY price, id LIMIT 50"
+                    ))
+                read_latencies.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                read_errors += 1
+
+    await asyncio.gather(
+        *(writer() for _ in range(args.writers)),
+        *(reader() for _ in range(args.readers)),
+    )
+    await db.close_database_connections()
+
+    return {
+        "profile": db.STORAGE_PROFILE,
+        "pragmas": db.SQLITE_PRAGMAS,
+        "reads": len(read_latencies),
+        "read_errors": read_errors,
+        "read_p50_ms": round(percentile(read_latencies, 50) or 0, 2),
+        "read_p99_ms": round(percentile(read_latencies, 99) or 0, 2),
+        "read_max_ms": round(max(read_latencies, default=0), 2),
+        "write_transactions": writes,
+        "write_errors": write_errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=["default", "production"])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per profile")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=5000, help="rows rewritten per write transaction")
+    parser.add_argument("--courses", type=int, default=20000)
+    parser.add_argument("--dir", default=None, help="directory for the benchmark databases (use a real disk)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_worker(args))))
+        return
+
+    results = []
+    for profile in args.profiles:
+        env = dict(os.environ)
+        env["SQLITE_STORAGE_PROFILE"] = profile
+        env["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(dir=args.dir), 'bench.db')}"
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.read_write_contention", "--worker", *sys.argv[1:]],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    print(json.dumps({"results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# backend/benchmarks/seed.py
+"""Synthetic dataset generator for benchmarks.
+
+Fills a fresh database with users, courses, cart items and orders using
+batched executemany inserts. All users share one password so only a single
+bcrypt hash has to be computed.
+
+    cd backend
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m benchmarks.seed --users 1000 --courses 5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+BENCH_PASSWORD = "bench-password"
+LEVELS = ("beginner", "intermediate", "advanced")
+TOPICS = ("python", "javascript", "sql", "design", "marketing", "data", "devops", "react", "fastapi", "security")
+BATCH_SIZE = 1000
+
+def bench_email(index: int) -> str:
+    return f"user{index}@bench-example.com"
+
+async def _insert_batched(conn, table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        await conn.execute(table.insert(), rows[start:start + BATCH_SIZE])
+
+async def seed_database(users: int = 100, courses: int = 500, cart_items: int = 300,
+                        orders: int = 300, items_per_order: int = 3, seed: int = 42) -> dict:
+    """Create the schema and load a deterministic synthetic dataset."""
+    from app import auth
+    from app.database_sqlite import engine, create_all_tables
+    from app.models import User, Course, CartItem, Order, OrderItem
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    await create_all_tables()
+    hashed_password = auth.get_password_hash(BENCH_PASSWORD)
+
+    user_rows = [
+        {"name": f"User {i}", "email": bench_email(i), "hashed_password": hashed_password, "is_active": True}
+        for i in range(1, users + 1)
+    ]
+    course_rows = []
+    for i in range(1, courses + 1):
+        topic = rng.choice(TOPICS)
+        course_rows.append({
+            "title": f"{topic.title()} course {i}",
+            "description": f"Learn {topic} step by step. " * rng.randint(2, 8),
+            "price": round(rng.uniform(5, 200), 2),
+            "instructor": f"Instructor {rng.randint(1, max(1, courses // 20))}",
+            "duration": f"{rng.randint(1, 12)} weeks",
+            "level": rng.choice(LEVELS),
+            "is_active": True,
+        })
+
+    cart_rows = []
+    per_user = {}
+    for _ in range(cart_items):
+        user_id = rng.randint(1, users)
+        course_id = rng.randint(1, courses)
+        if course_id in per_user.setdefault(user_id, set()):
+            continue
+        per_user[user_id].add(course_id)
+        cart_rows.append({"user_id": user_id, "course_id": course_id})
+
+    prices = {i + 1: row["price"] for i, row in enumerate(course_rows)}
+    order_rows = []
+    order_item_rows = []
+    for order_id in range(1, orders + 1):
+        picked = rng.sample(range(1, courses + 1), min(courses, rng.randint(1, items_per_order * 2 - 1)))
+        order_rows.append({
+            "id": order_id,
+            "user_id": rng.randint(1, users),
+            "total_amount": round(sum(prices[c] for c in picked), 2),
+            "status": "pending",
+        })
+        order_item_rows.extend({"order_id": order_id, "course_id": c, "price": prices[c]} for c in picked)
+
+    async with engine.begin() as conn:
+        await _insert_batched(conn, User.__table__, user_rows)
+        await _insert_batched(conn, Course.__table__, course_rows)
+        await _insert_batched(conn, CartItem.__table__, cart_rows)
+        await _insert_batched(conn, Order.__table__, order_rows)
+        await _insert_batched(conn, OrderItem.__table__, order_item_rows)
+
+    return {
+        "users": len(user_rows),
+        "courses": len(course_rows),
+        "cart_items": len(cart_rows),
+        "orders": len(order_rows),
+        "order_items": len(order_item_rows),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def add_seed_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--cart-items", type=int, default=300)
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+
+def seed_kwargs(args) -> dict:
+    return {
+        "users": args.users,
+        "courses": args.courses,
+        "cart_items": args.cart_items,
+        "orders": args.orders,
+        "items_per_order": args.items_per_order,
+        "seed": args.seed,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_seed_arguments(parser)
+    arguments = parser.parse_args()
+    print(json.dumps(asyncio.run(seed_database(**seed_kwargs(arguments))), indent=2))
@@ -0,0 +1,82 @@
+# backend/benchmarks/serialization.py
+"""Default vs fast serialization path on the list endpoints.
+
+Seeds a fresh database, then requests the catalog, a cart and an order
+history sequentially with ``app.fastpath`` switched off and on, reporting
+latency percentiles and response sizes for both.
+
+    cd backend
+    python -m benchmarks.serialization --requests 300 --limit 100
+"""
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from .common import summarize_latencies, use_temporary_database
+from .seed import add_seed_arguments, bench_email, seed_kwargs
+
+async def _measure(client, path, params, headers, requests: int) -> dict:
+    latencies = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path, params=params, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        size = int(response.headers.get("content-length", len(response.content)))
+    result = {"response_bytes": size}
+    result.update(summarize_latencies(latencies))
+    return result
+
+async def run_benchmark(args) -> dict:
+    use_temporary_database(args.dir)
+
+    import httpx
+    from sqlalchemy import func, select
+    from app import auth, fastpath
+    from app.database_sqlite import AsyncSessionLocal, close_database_connections
+    from app.main import app
+    from app.models import Order
+    from .seed import seed_database
+
+    dataset = await seed_database(**seed_kwargs(args))
+    # The seeded user with the most orders gives the heaviest order history
+    async with AsyncSessionLocal() as db:
+        user_id = (await db.execute(
+            select(Order.user_id).group_by(Order.user_id).order_by(func.count().desc()).limit(1)
+        )).scalar() or 1
+    user = SimpleNamespace(id=user_id, email=bench_email(user_id))
+    auth_headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': auth.token_subject(user)})}"}
+
+    cases = {
+        "courses": ("/api/courses", {"limit": args.limit}, {"Accept-Encoding": "identity"}),
+        "courses_gzip": ("/api/courses", {"limit": args.limit}, {"Accept-Encoding": "gzip, br"}),
+        "courses_page": ("/api/courses", {"limit": args.limit, "sort": "price"}, {"Accept-Encoding": "identity"}),
+        "cart": ("/api/cart", None, auth_headers),
+        "orders": ("/api/orders", None, auth_headers),
+    }
+
+    report = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode, enabled in (("default", False), ("fast", True)):
+            fastpath.ENABLED = enabled
+            for name, (path, params, headers) in cases.items():
+                await client.get(path, params=params, headers=headers)  # warm caches
+                report.setdefault(name, {})[mode] = await _measure(client, path, params, headers, args.requests)
+
+    await close_database_connections()
+    return {
+        "meta": {"requests": args.requests, "limit": args.limit, "orjson": fastpath.orjson is not None,
+                 "dataset": dataset},
+        "results": report,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="requests per case and mode")
+    parser.add_argument("--limit", type=int, default=100, help="catalog page size")
+    parser.add_argument("--dir", default=None, help="directory for the benchmark database")
+    add_seed_arguments(parser)
+    print(json.dumps(asyncio.run(run_benchmark(parser.parse_args())), indent=2))
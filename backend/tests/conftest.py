@@ -0,0 +1,48 @@
+# backend/tests/conftest.py - points the app at a scratch database for the test run
+#
+# The app binds its engines to DATABASE_URL when it is imported, so the
+# environment is set here, before any test module imports `app`. Tests call
+# `fresh_database()` to start from an empty file (or `pre_series_database()`
+# for a copy of a pre-versioning install), and run their async code
+# with `run()`, which disposes the engines before its event loop closes.
+import asyncio
+import os
+import sqlite3
+
+from benchmarks.common import use_temporary_database
+
+DATABASE = use_temporary_database()
+os.environ["PROFILE_DIR"] = os.path.join(os.path.dirname(DATABASE), "profiles")
+
+PRE_SERIES_DUMP = os.path.join(os.path.dirname(__file__), "data", "pre_series.sql")
+
+def fresh_database() -> str:
+    """Delete the scratch database and forget everything cached from it."""
+    from app.cache import catalog_cache, principal_cache, token_cache
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DATABASE + suffix):
+            os.remove(DATABASE + suffix)
+    catalog_cache.bump_version()
+    principal_cache.clear()
+    token_cache.clear()
+    return DATABASE
+
+def pre_series_database() -> str:
+    """A fresh scratch database holding the course_store.db shipped before schema versioning."""
+    path = fresh_database()
+    with open(PRE_SERIES_DUMP, encoding="utf-8") as dump, sqlite3.connect(path) as conn:
+        conn.executescript(dump.read())
+    return path
+
+def run(coroutine):
+    """Run a coroutine against the app's engines, closing their connections afterwards."""
+    from app.database_sqlite import close_database_connections
+
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await close_database_connections()
+
+    return asyncio.run(main())
@@ -0,0 +1,95 @@
+-- backend/course_store.db as shipped before schema versioning (sqlite3 .dump)
+BEGIN TRANSACTION;
+CREATE TABLE cart_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            course_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (course_id) REFERENCES courses (id)
+        );
+INSERT INTO "cart_items" VALUES(6,3,1,'2025-06-07 19:05:53');
+INSERT INTO "cart_items" VALUES(7,3,5,'2025-06-07 19:06:20');
+INSERT INTO "cart_items" VALUES(8,3,4,'2025-06-07 19:07:25');
+INSERT INTO "cart_items" VALUES(10,5,1,'2025-06-08 20:53:16');
+INSERT INTO "cart_items" VALUES(11,5,2,'2025-06-08 20:53:18');
+CREATE TABLE categories (
+	id INTEGER NOT NULL, 
+	name VARCHAR NOT NULL, 
+	description TEXT, 
+	is_active BOOLEAN, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	UNIQUE (name)
+);
+CREATE TABLE courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            price REAL NOT NULL,
+            instructor TEXT,
+            duration TEXT,
+            level TEXT,
+            image_url TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+INSERT INTO "courses" VALUES(1,'Курс по веб-разработке','Научитесь создавать современные сайты с нуля! Изучите HTML, CSS, JavaScript и современные фреймворки.',5000.0,'Иван Иванов','8 недель','Начинающий','/images/web-dev.jpg',1,'2025-06-02 17:59:30');
+INSERT INTO "courses" VALUES(2,'Курс по дизайну','Освойте основы графического дизайна и UX/UI. Научитесь работать в Figma, Adobe Creative Suite.',4500.0,'Мария Петрова','6 недель','Начинающий','/images/design.jpg',1,'2025-06-02 17:59:30');
+INSERT INTO "courses" VALUES(3,'Курс по программированию на Python','Станьте профессиональным разработчиком на Python! От основ до продвинутых техник.',6000.0,'Алексей Сидоров','12 недель','Средний','/images/python.jpg',1,'2025-06-02 17:59:30');
+INSERT INTO "courses" VALUES(4,'Курс по Data Science','Изучите анализ данных, машинное обучение и работу с большими данными.',8000.0,'Елена Козлова','16 недель','Продвинутый','/images/data-science.jpg',1,'2025-06-02 17:59:30');
+INSERT INTO "courses" VALUES(5,'Курс по мобильной разработке','Создавайте мобильные приложения для iOS и Android с React Native.',7000.0,'Дмитрий Волков','10 недель','Средний','/images/mobile.jpg',1,'2025-06-02 17:59:30');
+CREATE TABLE order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER,
+            course_id INTEGER,
+            price REAL NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders (id),
+            FOREIGN KEY (course_id) REFERENCES courses (id)
+        );
+INSERT INTO "order_items" VALUES(1,1,1,5000.0);
+INSERT INTO "order_items" VALUES(2,1,2,4500.0);
+INSERT INTO "order_items" VALUES(3,2,1,5000.0);
+CREATE TABLE orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            total_amount REAL NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        );
+INSERT INTO "orders" VALUES(1,3,9500.0,'pending','2025-06-05 11:12:38');
+INSERT INTO "orders" VALUES(2,3,5000.0,'pending','2025-06-05 11:13:25');
+CREATE TABLE reviews (
+	id INTEGER NOT NULL, 
+	course_id INTEGER, 
+	user_id INTEGER, 
+	rating INTEGER NOT NULL, 
+	comment TEXT, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(course_id) REFERENCES courses (id) ON DELETE CASCADE, 
+	FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            hashed_password TEXT NOT NULL,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+INSERT INTO "users" VALUES(1,'Администратор','admin@coursestore.ru','240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9',1,'2025-06-02 17:59:30');
+INSERT INTO "users" VALUES(2,'Тестовый пользователь','test@example.com','ecd71870d1963316a97e3ac3408c9835ad8cf0f3c1bc703527c30265534f75ae',1,'2025-06-02 17:59:30');
+INSERT INTO "users" VALUES(3,'Davkattt','davydovakatka@mail.ru','$2b$12$xu1ASgT9sAUDSN5O8Qwl5uwvQukdDvTaiCZnhGjfvGTVVP2JUriDy',1,'2025-06-04 13:28:21');
+INSERT INTO "users" VALUES(4,'ляляля','zmZMZX@mail.ru','$2b$12$RAldJBCyqVZaIB9ixZl2aumVnGeu1rE2LIYJyYSn5s2lrSimD/kky',1,'2025-06-08 20:39:46');
+INSERT INTO "users" VALUES(5,'kzkzkz','zkzkzkz@mail.ru','$2b$12$kxYUQQW2s/vOIH7k2KTAJeQCDCBDcwm5LNc2QHtQBqz8B4xH0ZrBa',1,'2025-06-08 20:40:40');
+CREATE INDEX ix_categories_id ON categories (id);
+CREATE INDEX ix_reviews_id ON reviews (id);
+DELETE FROM "sqlite_sequence";
+INSERT INTO "sqlite_sequence" VALUES('courses',5);
+INSERT INTO "sqlite_sequence" VALUES('users',5);
+INSERT INTO "sqlite_sequence" VALUES('cart_items',11);
+INSERT INTO "sqlite_sequence" VALUES('orders',2);
+INSERT INTO "sqlite_sequence" VALUES('order_items',3);
+COMMIT;
@@ -0,0 +1,24 @@
+# backend/tests/test_conditional.py - If-None-Match handling on catalog routes
+import httpx
+
+from app.database_sqlite import create_all_tables
+from app.main import app
+from conftest import pre_series_database, run
+
+async def _course_revalidation():
+    await create_all_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/courses/1")
+        assert response.status_code == 200, response.text
+        etag = response.headers["etag"]
+
+        response = await client.get("/api/courses/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        # Same catalog version, but there is no such course
+        response = await client.get("/api/courses/999", headers={"If-None-Match": etag})
+        assert response.status_code == 404
+
+def test_course_etag_does_not_hide_missing_courses():
+    pre_series_database()
+    run(_course_revalidation())
@@ -0,0 +1,26 @@
+# backend/tests/test_migrations.py - upgrading databases created before schema versioning
+from sqlalchemy import inspect
+
+from app import models
+from app.database_sqlite import engine
+from app.migrations import LATEST_VERSION, migrate
+from conftest import pre_series_database, run
+
+def _columns(sync_conn):
+    inspector = inspect(sync_conn)
+    return {table: {column["name"] for column in inspector.get_columns(table)}
+            for table in inspector.get_table_names()}
+
+async def _upgrade():
+    report = await migrate(engine)
+    async with engine.connect() as conn:
+        return report, await conn.run_sync(_columns)
+
+def test_pre_series_database_upgrades_to_the_models():
+    pre_series_database()
+    report, columns = run(_upgrade())
+    assert report["previous_version"] == 0
+    assert report["schema_version"] == LATEST_VERSION
+    missing = [f"{table.name}.{column.name}" for table in models.Base.metadata.sorted_tables
+               for column in table.columns if column.name not in columns.get(table.name, ())]
+    assert not missing, f"columns missing after the upgrade: {missing}"
@@ -0,0 +1,23 @@
+# backend/tests/test_query_budget.py - per-route SQL budgets (see benchmarks/query_budget.py)
+import pytest
+
+from benchmarks.query_budget import build_probes, measure
+from conftest import fresh_database, run
+
+SIZES = (1, 10, 30)
+
+@pytest.fixture(scope="module")
+def failures():
+    fresh_database()
+    _, failures = run(measure(SIZES))
+    return failures
+
+def test_every_route_has_a_probe(failures):
+    probed = {f"{probe.method} {probe.path}" for probe in build_probes()}
+    missing = sorted(name for name in failures if name not in probed)
+    assert not missing, "\n".join(f"{name}: {failures[name][0]}" for name in missing)
+
+@pytest.mark.parametrize("probe", build_probes(), ids=lambda probe: f"{probe.method} {probe.path}")
+def test_route_within_budget(failures, probe):
+    errors = failures.get(f"{probe.method} {probe.path}", [])
+    assert not errors, "\n\n".join(errors)
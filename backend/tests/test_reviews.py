@@ -0,0 +1,65 @@
+# backend/tests/test_reviews.py - review endpoints on an upgraded pre-versioning database
+import httpx
+import pytest
+
+from app.database_sqlite import create_all_tables, engine
+from app.main import app
+from conftest import pre_series_database, run
+
+PASSWORD = "review-password"
+COURSE_ID = 1  # one of the courses in tests/data/pre_series.sql
+
+async def _baselined_without_updated_at():
+    """Leave the database at version 4 as migrated before reviews.updated_at was part of the baseline."""
+    await create_all_tables()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ALTER TABLE reviews DROP COLUMN updated_at")
+        await conn.exec_driver_sql("DELETE FROM schema_version WHERE version > 4")
+
+async def _login(client, name: str) -> dict:
+    email = f"{name}@example.com"
+    response = await client.post("/api/register", json={"name": name, "email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    response = await client.post("/api/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def _rating(client) -> dict:
+    response = await client.get(f"/api/courses/{COURSE_ID}/rating")
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    return {"count": summary["count"], "average": summary["average"],
+            "histogram": {stars: n for stars, n in summary["histogram"].items() if n}}
+
+async def _review_lifecycle(prepare):
+    if prepare:
+        await prepare()
+    await create_all_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        alice, bob = await _login(client, "alice"), await _login(client, "bob")
+
+        response = await client.post(f"/api/courses/{COURSE_ID}/reviews", json={"rating": 2}, headers=alice)
+        assert response.status_code == 200, response.text
+        review_id = response.json()["id"]
+        response = await client.post(f"/api/courses/{COURSE_ID}/reviews",
+                                     json={"rating": 4, "comment": "Good"}, headers=bob)
+        assert response.status_code == 200, response.text
+        bob_review_id = response.json()["id"]
+        assert await _rating(client) == {"count": 2, "average": 3.0, "histogram": {"2": 1, "4": 1}}
+
+        response = await client.put(f"/api/reviews/{review_id}", json={"rating": 5}, headers=alice)
+        assert response.status_code == 200, response.text
+        assert response.json()["rating"] == 5
+        assert response.json()["updated_at"] is not None
+        assert await _rating(client) == {"count": 2, "average": 4.5, "histogram": {"4": 1, "5": 1}}
+
+        response = await client.delete(f"/api/reviews/{bob_review_id}", headers=bob)
+        assert response.status_code == 200, response.text
+        assert await _rating(client) == {"count": 1, "average": 5.0, "histogram": {"5": 1}}
+
+@pytest.mark.parametrize("prepare", [None, _baselined_without_updated_at],
+                         ids=["pre-series", "version-4-without-updated-at"])
+def test_reviews_on_upgraded_database(prepare):
+    pre_series_database()
+    run(_review_lifecycle(prepare))
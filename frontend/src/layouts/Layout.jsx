@@ -1,12 +1,15 @@
 // frontend/src/layouts/Layout.jsx
-import { NavLink, Outlet, useNavigate } from 'react-router-dom';
+import { NavLink, Outlet, useLocation, useNavigate } from 'react-router-dom';
 import { useState, useEffect } from 'react';
 import { ShoppingCart, User, LogOut, BookOpen } from 'lucide-react';
+import axios from 'axios';
 
 export default function Layout() {
   const [isAuth, setIsAuth] = useState(false);
   const [user, setUser] = useState(null);
+  const [cartCount, setCartCount] = useState(0);
   const navigate = useNavigate();
+  const location = useLocation();
 
   useEffect(() => {
     const token = localStorage.getItem('token');
@@ -32,6 +35,28 @@ export default function Layout() {
     return () => window.removeEventListener('storage', handler);
   }, []);
 
+  // Badge count from /api/cart/summary: one row lookup instead of the whole cart
+  useEffect(() => {
+    if (!isAuth) {
+      setCartCount(0);
+      return;
+    }
+    const fetchSummary = async () => {
+      try {
+        const token = localStorage.getItem('token');
+        const response = await axios.get('http://localhost:8000/api/cart/summary', {
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        setCartCount(response.data.item_count);
+      } catch (error) {
+        console.error('Error fetching cart summary:', error);
+      }
+    };
+    fetchSummary();
+    window.addEventListener('cart-changed', fetchSummary);
+    return () => window.removeEventListener('cart-changed', fetchSummary);
+  }, [isAuth, location.pathname]);
+
   const handleLogout = () => {
     localStorage.removeItem('token');
     localStorage.removeItem('user');
@@ -95,6 +120,11 @@ export default function Layout() {
                   <NavLinkWithClass to="/cart" className="flex items-center space-x-1 text-white">
                     <ShoppingCart className="h-4 w-4" />
                     <span>Корзина</span>
+                    {cartCount > 0 && (
+                      <span className="ml-1 bg-blue-600 text-white text-xs font-semibold rounded-full px-2 py-0.5">
+                        {cartCount}
+                      </span>
+                    )}
                   </NavLinkWithClass>
                   <NavLinkWithClass to="/profile" className="flex items-center space-x-1 text-white">
                     <User className="h-4 w-4" />
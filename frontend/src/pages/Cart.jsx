@@ -1,5 +1,5 @@
 // frontend/src/pages/Cart.jsx
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Trash2, ShoppingBag, ArrowRight } from 'lucide-react';
 import axios from 'axios';
@@ -9,6 +9,8 @@ export default function Cart() {
   const [loading, setLoading] = useState(true);
   const [processingOrder, setProcessingOrder] = useState(false);
   const navigate = useNavigate();
+  // One key per checkout attempt so retries and double-clicks reuse the same order
+  const checkoutKey = useRef(null);
 
   useEffect(() => {
     const token = localStorage.getItem('token');
@@ -43,6 +45,7 @@ export default function Cart() {
         headers: { Authorization: `Bearer ${token}` }
       });
       setCartItems(cartItems.filter(item => item.id !== cartItemId));
+      window.dispatchEvent(new Event('cart-changed'));
     } catch (error) {
       console.error('Error removing item:', error);
       alert('Ошибка при удалении курса из корзины');
@@ -56,12 +59,20 @@ export default function Cart() {
     }
 
     setProcessingOrder(true);
+    if (!checkoutKey.current) {
+      checkoutKey.current = crypto.randomUUID();
+    }
     try {
       const token = localStorage.getItem('token');
       const response = await axios.post('http://localhost:8000/api/orders', {}, {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: {
+          Authorization: `Bearer ${token}`,
+          'Idempotency-Key': checkoutKey.current
+        }
       });
       
+      checkoutKey.current = null;
+      window.dispatchEvent(new Event('cart-changed'));
       alert('Заказ успешно оформлен!');
       setCartItems([]);
       navigate('/profile'); // Redirect to profile to see orders
@@ -36,6 +36,7 @@ export default function Courses() {
         { course_id: courseId },
         { headers: { Authorization: `Bearer ${token}` } }
       );
+      window.dispatchEvent(new Event('cart-changed'));
       alert('Курс добавлен в корзину!');
     } catch (error) {
       if (error.response?.status === 400) {
@@ -115,6 +115,7 @@ function CourseCard({ course }) {
         { course_id: course.id },
         { headers: { Authorization: `Bearer ${token}` } }
       );
+      window.dispatchEvent(new Event('cart-changed'));
       alert('Курс добавлен в корзину!');
     } catch (error) {
       if (error.response?.status === 400) {
@@ -7,6 +7,8 @@ import axios from 'axios';
 export default function Profile() {
   const [user, setUser] = useState(null);
   const [orders, setOrders] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [orderDetails, setOrderDetails] = useState({});
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('profile');
   const navigate = useNavigate();
@@ -17,36 +19,58 @@ export default function Profile() {
       navigate('/login');
       return;
     }
-    fetchUserData();
-    fetchOrders();
+    fetchProfile();
   }, [navigate]);
 
-  const fetchUserData = async () => {
+  // User and the first page of order summaries in a single round trip
+  const fetchProfile = async () => {
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get('http://localhost:8000/api/me', {
+      const response = await axios.get('http://localhost:8000/api/bootstrap', {
+        params: { fields: 'user,order_history' },
         headers: { Authorization: `Bearer ${token}` }
       });
-      setUser(response.data);
+      setUser(response.data.user);
+      setOrders(response.data.order_history.items);
+      setNextCursor(response.data.order_history.next_cursor);
     } catch (error) {
-      console.error('Error fetching user data:', error);
+      console.error('Error fetching profile:', error);
       if (error.response?.status === 401) {
         navigate('/login');
       }
+    } finally {
+      setLoading(false);
     }
   };
 
-  const fetchOrders = async () => {
+  const fetchMoreOrders = async () => {
     try {
       const token = localStorage.getItem('token');
-      const response = await axios.get('http://localhost:8000/api/orders', {
+      const response = await axios.get('http://localhost:8000/api/orders/history', {
+        params: { after: nextCursor },
         headers: { Authorization: `Bearer ${token}` }
       });
-      setOrders(response.data);
+      setOrders((loaded) => [...loaded, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching orders:', error);
-    } finally {
-      setLoading(false);
+    }
+  };
+
+  // Line items are loaded only when an order is expanded
+  const toggleOrderDetails = async (orderId) => {
+    if (orderDetails[orderId]) {
+      setOrderDetails(({ [orderId]: _, ...rest }) => rest);
+      return;
+    }
+    try {
+      const token = localStorage.getItem('token');
+      const response = await axios.get(`http://localhost:8000/api/orders/${orderId}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setOrderDetails((details) => ({ ...details, [orderId]: response.data }));
+    } catch (error) {
+      console.error('Error fetching order details:', error);
     }
   };
 
@@ -236,9 +260,16 @@ export default function Profile() {
                         </div>
                       </div>
 
+                      <button
+                        onClick={() => toggleOrderDetails(order.id)}
+                        className="text-sm text-blue-600 hover:text-blue-700 mb-3"
+                      >
+                        {orderDetails[order.id] ? 'Скрыть курсы' : `Курсы в заказе (${order.item_count})`}
+                      </button>
+
+                      {orderDetails[order.id] && (
                       <div className="space-y-3">
-                        <h4 className="font-medium text-gray-900">Курсы в заказе:</h4>
-                        {order.order_items.map((item) => (
+                        {orderDetails[order.id].order_items.map((item) => (
                           <div key={item.id} className="flex justify-between items-center p-3 bg-gray-50 rounded-lg">
                             <div>
                               <h5 className="font-medium text-gray-900">{item.course.title}</h5>
@@ -254,8 +285,17 @@ export default function Profile() {
                           </div>
                         ))}
                       </div>
+                      )}
                     </div>
                   ))}
+
+                  {nextCursor && (
+                    <div className="text-center">
+                      <button onClick={fetchMoreOrders} className="btn-primary">
+                        Показать ещё
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>